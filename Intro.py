@@ -1,4 +1,5 @@
 import streamlit as st
+from app_data import start_warm_up
 
 st.set_page_config(
     page_title="Malaysia District Living Recommendation System",
@@ -17,3 +18,6 @@ Use the sidebar to navigate:
 - 🏠 House rental recommendations
 - 🌏 Combined living place recommendations
 """)
+
+#The landing page needs no data; warm the caches of the other pages in the background
+start_warm_up()
@@ -0,0 +1,140 @@
+import os
+import threading
+import time
+
+import streamlit as st
+
+#Only streamlit is imported here: pandas and the data modules are imported inside
+#the loaders, so a page can draw its title before paying for them
+
+JOB_SCORES_PATH = "job_scores.csv"
+HOUSE_SCORES_PATH = "house_scores.csv"
+HOUSE_RAW_PATH = "house_data_cleaned.csv"
+DISTRICT_SCORES_PATH = "district_scores.csv"
+#Set to "0" to skip the background warm-up (import_report.py does, to time each page alone)
+WARM_UP_ENV = "APP_WARM_UP"
+
+
+def _mtime(path):
+    return os.path.getmtime(path) if os.path.exists(path) else None
+
+
+#The loaders are shared by every page, so a dataset is read once per server
+#rather than once per page, and the file mtime in the key picks up rewritten files
+@st.cache_data(show_spinner=False)
+def _read_job_scores(mtime):
+    import pandas as pd
+    return pd.read_csv(JOB_SCORES_PATH)
+
+
+@st.cache_data(show_spinner=False)
+def _read_house_table(path, mtime):
+    from house_data import read_house_table
+    return read_house_table(path)
+
+
+@st.cache_data(show_spinner=False)
+def _read_district_scores(mtime):
+    import pandas as pd
+    return pd.read_csv(DISTRICT_SCORES_PATH)
+
+
+@st.cache_data(show_spinner=False)
+def _read_sketches(mtime):
+    from quantile_sketch import SKETCHES_PATH, load_sketches
+    return load_sketches(SKETCHES_PATH)
+
+
+@st.cache_data(show_spinner=False)
+def _district_skyline(scores_mtime, jobs_mtime, raw_mtime, sketches_mtime):
+    from recommender import district_skyline_layers
+    return district_skyline_layers(
+        load_district_scores(),
+        load_job_scores(),
+        load_house_raw(),
+        sketches=load_quantile_sketches()
+    )
+
+
+def data_version(*paths):
+    """File mtimes of `paths`, to key caches that take the data itself as an unhashed argument"""
+    return tuple(_mtime(path) for path in paths)
+
+
+def load_job_scores():
+    return _read_job_scores(_mtime(JOB_SCORES_PATH))
+
+
+def load_house_scores():
+    return _read_house_table(HOUSE_SCORES_PATH, _mtime(HOUSE_SCORES_PATH))
+
+
+def load_house_raw():
+    return _read_house_table(HOUSE_RAW_PATH, _mtime(HOUSE_RAW_PATH))
+
+
+def load_district_scores():
+    return _read_district_scores(_mtime(DISTRICT_SCORES_PATH))
+
+
+def load_quantile_sketches():
+    """Per-district salary/rent sketches built by quantile_sketch.py, or None"""
+    from quantile_sketch import SKETCHES_PATH
+    return _read_sketches(_mtime(SKETCHES_PATH))
+
+
+def load_district_skyline():
+    """District skyline layers; they depend on no widget, so they are computed once per data version"""
+    from quantile_sketch import SKETCHES_PATH
+    return _district_skyline(
+        _mtime(DISTRICT_SCORES_PATH), _mtime(JOB_SCORES_PATH), _mtime(HOUSE_RAW_PATH), _mtime(SKETCHES_PATH)
+    )
+
+
+WARM_UP_STEPS = [
+    ("import pandas", lambda: __import__("pandas")),
+    ("import plotly", lambda: (__import__("plotly.express"), __import__("plotly.graph_objects"))),
+    ("import recommender", lambda: __import__("recommender")),
+    ("job_scores.csv", load_job_scores),
+    ("house_scores.csv", load_house_scores),
+    ("house_data_cleaned.csv", load_house_raw),
+    ("district_scores.csv", load_district_scores),
+    ("quantile sketches", load_quantile_sketches),
+    ("district skyline", load_district_skyline),
+]
+
+
+def warm_up(timings=None):
+    """
+    Import the heavy modules and fill the shared data caches, returning the
+    seconds spent on each step. A missing data file skips its step.
+    """
+    timings = {} if timings is None else timings
+    for name, step in WARM_UP_STEPS:
+        start = time.perf_counter()
+        try:
+            step()
+        except FileNotFoundError:
+            continue
+        timings[name] = round(time.perf_counter() - start, 3)
+    return timings
+
+
+@st.cache_resource(show_spinner=False)
+def start_warm_up():
+    """
+    Run warm_up once per server process in a background thread.
+
+    Every page imports its heavy modules and loads its data after drawing its
+    title, and calls this at the very end, once it is fully drawn, so the
+    warm-up does not compete with the page the user landed on. The first visit
+    after a deploy then warms the caches for every other page while the user
+    reads that page. A page that needs data the thread is still loading waits on
+    the same cache entry instead of loading it twice. Returns the timings dict
+    the thread fills.
+    """
+    timings = {}
+    if os.environ.get(WARM_UP_ENV) == "0":
+        return timings
+    threading.Thread(target=warm_up, args=(timings,), name="app-warm-up", daemon=True).start()
+    return timings
@@ -0,0 +1,195 @@
+import re
+import sys
+import zlib
+
+import numpy as np
+import pandas as pd
+
+#64 permutations split into 16 bands of 4 rows: the LSH S-curve crosses 50% near
+#0.5 Jaccard, well below THRESHOLD, so true duplicates are almost never missed
+NUM_PERM = 64
+BANDS = 16
+THRESHOLD = 0.85
+
+_PRIME = (1 << 31) - 1
+_COMPANY_SUFFIXES = re.compile(r"\b(sdn|bhd|berhad|enterprise|plt|plc|ltd|limited)\b")
+#Words that make a different role of an otherwise identical title ("Pen." is Penolong, assistant)
+_LEVEL_WORDS = {
+    "junior", "jr", "senior", "sr", "snr", "staff", "head", "chief", "principal", "lead",
+    "assistant", "asst", "pen", "penolong", "intern", "trainee", "i", "ii", "iii", "iv", "v"
+}
+
+
+def _normalize(text):
+    if pd.isna(text):
+        return ""
+    return re.sub(r"[^a-z0-9]+", " ", str(text).lower()).strip()
+
+
+def _char_shingles(text, k=3):
+    text = f" {text} "
+    return {text[i:i + k] for i in range(max(1, len(text) - k + 1))}
+
+
+def job_city(location):
+    """Return the city code of a scraped location dict (or the normalised text)"""
+    city_match = re.search(r"'CITY':\s*'([^']+)'", str(location))
+    return city_match.group(1).lower() if city_match else _normalize(location)
+
+
+def job_company(company):
+    """Return the company name without case, punctuation or legal suffixes"""
+    return re.sub(r"\s+", " ", _COMPANY_SUFFIXES.sub(" ", _normalize(company))).strip()
+
+
+def job_level(title):
+    """
+    Return the seniority/grade marker of a title: its level words and numbers.
+    'Senior Mine Geologist' and 'Junior Mine Geologist', or 'Grade 1' and
+    'Grade 2', are near-identical strings but different vacancies.
+    """
+    text = _normalize(title)
+    words = sorted(_LEVEL_WORDS.intersection(text.split()))
+    return " ".join(words + sorted(re.findall(r"\d+", text)))
+
+
+def job_shingles(title):
+    """
+    Return the hashed shingle set of a job title.
+
+    Character 3-grams are robust to small edits such as a dropped dash or a
+    different spacing. The company is not shingled: it is part of the bucket
+    key instead, so a long company name cannot outweigh a short title.
+    """
+    shingles = _char_shingles(_normalize(title))
+    return np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) % _PRIME for s in shingles),
+        dtype=np.uint64,
+        count=len(shingles)
+    )
+
+
+class NearDuplicateIndex:
+    """
+    MinHash/LSH index that assigns a canonical cluster id to every job posting.
+
+    Each title is hashed into NUM_PERM MinHash values, split into BANDS bands.
+    Band buckets are keyed by city, normalised company and title level (see
+    job_level) as well, so only postings of the same employer in the same city
+    at the same level whose titles share at least one band are compared, and adding a posting costs roughly O(1) instead of a
+    scan over every previous posting. A new posting joins the cluster of its most
+    similar candidate when the exact Jaccard similarity of the title shingles
+    reaches `threshold` (MinHash only finds the candidates, so its estimation
+    noise cannot merge different roles), otherwise it starts a cluster named
+    after its own job_id.
+    Existing cluster ids never change.
+    """
+
+    def __init__(self, num_perm=NUM_PERM, bands=BANDS, threshold=THRESHOLD, seed=42):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=num_perm, dtype=np.uint64)
+        self._rows = num_perm // bands
+        self._threshold = threshold
+
+        #One dict per band: band hash -> {cluster_id: row}
+        self._buckets = [{} for _ in range(bands)]
+        self._shingles = []
+        self._cluster_ids = []
+
+    def __len__(self):
+        return len(self._cluster_ids)
+
+    def signature(self, shingles):
+        if len(shingles) == 0:
+            return np.full(len(self._a), _PRIME, dtype=np.uint64)
+        hashed = (self._a[:, None] * shingles[None, :] + self._b[:, None]) % _PRIME
+        return hashed.min(axis=1)
+
+    def add(self, job_id, title, company, location, cluster_id=None):
+        """Index a posting and return its cluster id (kept as is when given)"""
+        shingles = job_shingles(title)
+        sig = self.signature(shingles)
+        employer = f"{job_city(location)}|{job_company(company)}|{job_level(title)}|".encode("utf-8")
+        band_keys = [
+            employer + sig[i * self._rows:(i + 1) * self._rows].tobytes()
+            for i in range(len(self._buckets))
+        ]
+
+        if cluster_id is None or pd.isna(cluster_id):
+            cluster_id = self._match(set(shingles.tolist()), band_keys)
+            if cluster_id is None:
+                cluster_id = job_id
+
+        row = len(self._shingles)
+        self._shingles.append(set(shingles.tolist()))
+        self._cluster_ids.append(cluster_id)
+
+        #A bucket keeps one member per cluster, so heavily reposted vacancies do not grow it
+        for buckets, key in zip(self._buckets, band_keys):
+            buckets.setdefault(key, {}).setdefault(cluster_id, row)
+
+        return cluster_id
+
+    def add_frame(self, df, cluster_col="dup_cluster_id"):
+        """Index every row of a scraped job frame and return the cluster ids in row order"""
+        existing = df[cluster_col] if cluster_col in df.columns else [None] * len(df)
+        return [
+            self.add(job_id, title, company, location, cluster_id)
+            for job_id, title, company, location, cluster_id in zip(
+                df["job_id"], df["title"], df["company"], df["location"], existing
+            )
+        ]
+
+    def _match(self, shingles, band_keys):
+        candidates = set()
+        for buckets, key in zip(self._buckets, band_keys):
+            candidates.update(buckets.get(key, {}).values())
+
+        if not candidates:
+            return None
+
+        candidates = sorted(candidates)
+        similarity = [
+            len(shingles & self._shingles[c]) / max(1, len(shingles | self._shingles[c]))
+            for c in candidates
+        ]
+        best = int(np.argmax(similarity))
+        if similarity[best] < self._threshold:
+            return None
+        return self._cluster_ids[candidates[best]]
+
+
+def assign_duplicate_clusters(df, cluster_col="dup_cluster_id"):
+    """
+    Fill `cluster_col` for rows that do not have one yet.
+
+    Rows that already carry a cluster id (from earlier scrapes) are indexed with it
+    first, so only the new rows are matched and old ids stay stable.
+    """
+    df = df.copy()
+    if cluster_col not in df.columns:
+        df[cluster_col] = None
+
+    has_id = df[cluster_col].notna()
+    index = NearDuplicateIndex()
+    index.add_frame(df[has_id], cluster_col)
+    df.loc[~has_id, cluster_col] = index.add_frame(df[~has_id], cluster_col)
+
+    return df
+
+
+if __name__ == "__main__":
+    #Usage: python dedup.py [jobs csv] [rebuild]  -- backfills dup_cluster_id in place,
+    #or reassigns every cluster with 'rebuild' (e.g. after changing the matching rules)
+    args = [a for a in sys.argv[1:] if a != "rebuild"]
+    file_path = args[0] if args else "jobs_myfuturejobs.csv"
+    jobs = pd.read_csv(file_path, encoding="utf-8-sig")
+    if "rebuild" in sys.argv[1:]:
+        jobs = jobs.drop(columns=["dup_cluster_id"], errors="ignore")
+    jobs = assign_duplicate_clusters(jobs)
+    jobs.to_csv(file_path, index=False, encoding="utf-8-sig")
+    print(f"{len(jobs)} jobs in {jobs['dup_cluster_id'].nunique()} clusters saved to '{file_path}'")
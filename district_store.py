@@ -0,0 +1,286 @@
+import os
+import sys
+
+import pandas as pd
+
+#Running sums/counts per district, kept separately from district_scores.csv because
+#districts that only have jobs (or only houses) must be remembered as well
+AGGREGATES_PATH = "district_aggregates.csv"
+#The (id, district, score) of every listing in the sums, so a new score file is applied as a delta
+MEMBERS_PATH = "district_members.csv"
+DISTRICT_SCORES_PATH = "district_scores.csv"
+JOB_SCORES_PATH = "job_scores.csv"
+HOUSE_SCORES_PATH = "house_scores.csv"
+
+_JOB, _HOUSE = 0, 2
+#Per side: (id, state, district, score) columns of the scored frame and the member file label
+_SIDES = {
+    _JOB: (["job_id", "state", "district", "job_score"], "job"),
+    _HOUSE: (["listing_id", "State", "District", "house_score"], "house"),
+}
+_MEMBER_COLS = ["state", "district", "score"]
+
+
+class DistrictScoreStore:
+    """
+    Incrementally maintained version of the district table built at the end of
+    place_recommendation.ipynb.
+
+    Every (state, district) keeps [job_sum, job_count, house_sum, house_count], so a
+    single listing is inserted or deleted in O(1). The store also remembers the
+    district and score of every listing by job_id/listing_id, so `sync` with a new
+    job_scores.csv or house_scores.csv only touches the rows that were added,
+    removed or rescored. Only districts with both jobs and houses are reported
+    (the notebook's inner merge). The min/max of the district averages used for
+    job_score_norm/house_score_norm is tracked as updates arrive and only
+    rescanned when the district holding a bound moves inwards.
+
+    The running sums serve in-memory reads only. `save` and `write_scores` first
+    recompute them from the members with one groupby, so the written files depend
+    on the current scores alone and not on the order updates arrived in.
+    """
+
+    def __init__(self):
+        self._totals = {}
+        self._bounds = None
+        self._members = {side: _empty_members() for side in _SIDES}
+        #False while the running sums may differ in rounding from a groupby over the members
+        self._settled = False
+
+    def __len__(self):
+        return sum(1 for totals in self._totals.values() if self._averages(totals) is not None)
+
+    @classmethod
+    def from_scores(cls, job_df, house_df):
+        """Build the store from job_scores.csv and house_scores.csv style frames"""
+        store = cls()
+        store._members = {_JOB: _member_frame(job_df, _JOB), _HOUSE: _member_frame(house_df, _HOUSE)}
+        store._settle()
+        return store
+
+    @classmethod
+    def load(cls, path=AGGREGATES_PATH, members_path=MEMBERS_PATH):
+        store = cls()
+        df = pd.read_csv(path, float_precision="round_trip")
+        for row in df.itertuples(index=False):
+            store._totals[(row.state, row.district)] = [
+                float(row.job_score_sum), int(row.job_count),
+                float(row.house_score_sum), int(row.house_count)
+            ]
+
+        members = pd.read_csv(members_path, dtype={"id": str}, float_precision="round_trip")
+        for side, (_, label) in _SIDES.items():
+            store._members[side] = members[members["side"] == label].set_index("id")[_MEMBER_COLS]
+        #The saved sums were settled before they were written
+        store._settled = True
+        return store
+
+    def save(self, path=AGGREGATES_PATH, members_path=MEMBERS_PATH):
+        self._settle()
+        rows = [
+            (state, district, *totals)
+            for (state, district), totals in sorted(self._totals.items())
+        ]
+        df = pd.DataFrame(
+            rows,
+            columns=["state", "district", "job_score_sum", "job_count", "house_score_sum", "house_count"]
+        )
+        df.to_csv(path, index=False)
+
+        members = pd.concat(
+            [self._members[side].assign(side=label) for side, (_, label) in _SIDES.items()]
+        )
+        members.rename_axis("id").reset_index()[["side", "id"] + _MEMBER_COLS].to_csv(members_path, index=False)
+
+    def sync(self, job_df=None, house_df=None):
+        """
+        Bring the store up to date with a new scored job and/or house frame.
+
+        Rows are matched on job_id/listing_id: rows that are gone or whose district
+        or score changed are removed, and new or changed rows are added, so the cost
+        is one vectorised diff plus O(1) per changed row. Returns the number of
+        removals and insertions applied.
+        """
+        applied = 0
+        for side, df in ((_JOB, job_df), (_HOUSE, house_df)):
+            if df is None:
+                continue
+            current = _member_frame(df, side)
+            removed, added = _row_delta(self._members[side], current)
+            for state, district, score in removed.itertuples(index=False):
+                self._update(state, district, side, score, -1)
+            for state, district, score in added.itertuples(index=False):
+                self._update(state, district, side, score, 1)
+            self._members[side] = current
+            applied += len(removed) + len(added)
+        if applied:
+            self._settled = False
+        return applied
+
+    def to_frame(self):
+        """Return the district table with the same columns as district_scores.csv"""
+        columns = [
+            "state", "district", "avg_job_score", "job_count", "avg_house_score",
+            "house_count", "job_score_norm", "house_score_norm"
+        ]
+        (job_lo, job_hi), (house_lo, house_hi) = self._current_bounds()
+
+        rows = []
+        for (state, district), totals in sorted(self._totals.items()):
+            averages = self._averages(totals)
+            if averages is None:
+                continue
+            job_avg, house_avg = averages
+            rows.append((
+                state, district, job_avg, totals[_JOB + 1], house_avg, totals[_HOUSE + 1],
+                _scale(job_avg, job_lo, job_hi), _scale(house_avg, house_lo, house_hi)
+            ))
+
+        return pd.DataFrame(rows, columns=columns)
+
+    def write_scores(self, path=DISTRICT_SCORES_PATH):
+        #Same layout as the notebook export (index column included)
+        self._settle()
+        self.to_frame().to_csv(path)
+
+    def _settle(self):
+        """Recompute the sums from the members in a fixed (row) order"""
+        if self._settled:
+            return
+        self._totals = {}
+        for side in _SIDES:
+            agg = self._members[side].groupby(["state", "district"])["score"].agg(["sum", "count"])
+            for (state, district), row in agg.iterrows():
+                totals = self._totals.setdefault((state, district), [0.0, 0, 0.0, 0])
+                totals[side] += row["sum"]
+                totals[side + 1] += int(row["count"])
+        self._bounds = None
+        self._settled = True
+
+    def _update(self, state, district, offset, score, count):
+        if pd.isna(state) or pd.isna(district) or pd.isna(score):
+            return
+
+        key = (state, district)
+        totals = self._totals.get(key, [0.0, 0, 0.0, 0])
+        if totals[offset + 1] + count < 0:
+            raise ValueError(f"Cannot remove a listing from {district}, {state}: none recorded")
+        self._totals[key] = totals
+
+        before = self._averages(totals)
+        totals[offset] += count * score
+        totals[offset + 1] += count
+
+        #Reset the running sum once a side is empty so float drift does not accumulate
+        if totals[offset + 1] == 0:
+            totals[offset] = 0.0
+        if totals[_JOB + 1] == 0 and totals[_HOUSE + 1] == 0:
+            del self._totals[key]
+
+        after = self._averages(totals)
+        self._track_bounds(before, after)
+
+    @staticmethod
+    def _averages(totals):
+        if totals[_JOB + 1] == 0 or totals[_HOUSE + 1] == 0:
+            return None
+        return totals[_JOB] / totals[_JOB + 1], totals[_HOUSE] / totals[_HOUSE + 1]
+
+    def _track_bounds(self, before, after):
+        if self._bounds is None:
+            return
+
+        for i, (lo, hi) in enumerate(self._bounds):
+            if before is not None and (
+                (before[i] == lo and (after is None or after[i] > lo)) or
+                (before[i] == hi and (after is None or after[i] < hi))
+            ):
+                #The district that defined this bound moved inwards: rescan on next read
+                self._bounds = None
+                return
+
+        if after is not None:
+            self._bounds = [
+                (min(lo, value), max(hi, value))
+                for (lo, hi), value in zip(self._bounds, after)
+            ]
+
+    def _current_bounds(self):
+        if self._bounds is None:
+            averages = [a for a in map(self._averages, self._totals.values()) if a is not None]
+            if not averages:
+                return (0.0, 0.0), (0.0, 0.0)
+            job_avgs, house_avgs = zip(*averages)
+            self._bounds = [(min(job_avgs), max(job_avgs)), (min(house_avgs), max(house_avgs))]
+        return self._bounds
+
+
+def _scale(value, lo, hi):
+    #Matches MinMaxScaler, which maps a constant column to 0
+    return (value - lo) / (hi - lo) if hi > lo else 0.0
+
+
+def _empty_members():
+    return pd.DataFrame(columns=_MEMBER_COLS, index=pd.Index([], name="id", dtype=object))
+
+
+def _member_frame(df, side):
+    columns, _ = _SIDES[side]
+    members = df[columns].copy()
+    members.columns = ["id"] + _MEMBER_COLS
+    members["id"] = members["id"].astype(str)
+    members["score"] = members["score"].astype(float)
+    assert members["id"].is_unique, f"Scored rows have duplicate {columns[0]} values"
+    return members.set_index("id")
+
+
+def _row_delta(old, new):
+    """Return (rows of `old` that are gone or changed in `new`, rows of `new` that are new or changed)"""
+    common = old.index.intersection(new.index)
+    before, after = old.loc[common], new.loc[common]
+    same = ((before == after) | (before.isna() & after.isna())).all(axis=1).to_numpy()
+    changed = common[~same]
+    return (
+        old.loc[old.index.difference(new.index).union(changed)],
+        new.loc[new.index.difference(old.index).union(changed)]
+    )
+
+
+def _mtime(path):
+    return os.path.getmtime(path) if os.path.exists(path) else None
+
+
+def load_store(aggregates_path=AGGREGATES_PATH, members_path=MEMBERS_PATH,
+               job_scores_path=JOB_SCORES_PATH, house_scores_path=HOUSE_SCORES_PATH):
+    """
+    Load the saved store and apply the rows of any score file written since it was
+    saved. Without a saved store (or one saved before members were recorded) it is
+    rebuilt from the score files.
+    """
+    if not (os.path.exists(aggregates_path) and os.path.exists(members_path)):
+        return DistrictScoreStore.from_scores(
+            pd.read_csv(job_scores_path),
+            pd.read_csv(house_scores_path)
+        )
+
+    store = DistrictScoreStore.load(aggregates_path, members_path)
+    saved = min(_mtime(aggregates_path), _mtime(members_path))
+    newer = [
+        pd.read_csv(path) if _mtime(path) is not None and _mtime(path) >= saved else None
+        for path in (job_scores_path, house_scores_path)
+    ]
+    store.sync(*newer)
+    return store
+
+
+if __name__ == "__main__":
+    #Usage: python district_store.py [rebuild]
+    if len(sys.argv) > 1 and sys.argv[1] == "rebuild":
+        for path in (AGGREGATES_PATH, MEMBERS_PATH):
+            if os.path.exists(path):
+                os.remove(path)
+
+    store = load_store()
+    store.save()
+    store.write_scores()
+    print(f"Saved {len(store)} districts to '{DISTRICT_SCORES_PATH}'")
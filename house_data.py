@@ -0,0 +1,254 @@
+import hashlib
+import re
+
+import numpy as np
+import pandas as pd
+
+ID_COL = "listing_id"
+
+#Fields that are not rewritten by cleaning (Location/District/State get filled in),
+#so the same listing hashes to the same id in House_Rental.csv and house_data_cleaned.csv
+_KEY_FIELDS = [
+    "Name", "Price", "Size", "Number of beds", "Number of bathrooms",
+    "Type", "Furnished Status", "Facilities", "Public transport"
+]
+_NUMERIC_FIELDS = ["Price", "Size", "Number of beds", "Number of bathrooms"]
+
+#Bit i of facility_mask is FACILITIES[i]; the order is stored in the data files,
+#so new facilities must be appended (16 bits available in the uint16 mask)
+FACILITIES = [
+    "Parking", "Security", "Playground", "Swimming Pool", "Gymnasium", "Lift",
+    "Barbeque area", "Minimart", "Multipurpose hall", "Jogging Track", "Sauna",
+    "Club house", "Tennis Court", "Squash Court", "Public transport"
+]
+FACILITY_BITS = {name: np.uint16(1 << i) for i, name in enumerate(FACILITIES)}
+
+MALAYSIA_STATES = [
+    'Johor', 'Kedah', 'Kelantan', 'Malacca', 'Melaka', 'Negeri Sembilan', 'Pahang', 'Penang', 'Pulau Pinang',
+    'Perak', 'Perlis', 'Sabah', 'Sarawak', 'Selangor', 'Terengganu', 'Kuala Lumpur', 'Putrajaya', 'Labuan'
+]
+SCORE_FEATURES = ["Price", "Size", "Number of beds", "Number of bathrooms"]
+
+
+def listing_id_from_url(url):
+    """Return the Mudah ad id of a listing URL (e.g. '...-113248576.htm' -> 'M113248576')"""
+    match = re.search(r"-(\d+)\.htm", str(url))
+    return f"M{match.group(1)}" if match else None
+
+
+def clean_numeric(series):
+    """Convert scraped numbers such as '2,200' or '1,400 sqft' to floats"""
+    return pd.to_numeric(
+        series.astype(str)
+        .str.replace(",", "", regex=False)
+        .str.replace('"', "", regex=False)
+        .str.replace("sqft", "", regex=False)
+        .str.strip(),
+        errors="coerce"
+    )
+
+
+def _normalized_key_fields(df):
+    fields = pd.DataFrame(index=df.index)
+    for col in _KEY_FIELDS:
+        if col not in df.columns:
+            fields[col] = ""
+        elif col in _NUMERIC_FIELDS:
+            values = clean_numeric(df[col])
+            fields[col] = values.map(lambda v: "" if pd.isna(v) else f"{v:.10g}")
+        else:
+            #Cleaning fills missing Facilities with 'None'
+            fields[col] = df[col].fillna("").astype(str).str.strip().replace("None", "").str.lower()
+    return fields
+
+
+def content_ids(df):
+    """
+    Return a content-hash listing id for every row of a house frame.
+
+    Exact duplicate listings are told apart by their order of appearance
+    (H<hash>, H<hash>-1, ...), which cleaning preserves since it only drops rows.
+    """
+    fields = _normalized_key_fields(df)
+    digests = pd.Series(
+        [
+            hashlib.sha1("\x1f".join(row).encode("utf-8")).hexdigest()[:12]
+            for row in fields.itertuples(index=False, name=None)
+        ],
+        index=df.index
+    )
+    occurrence = digests.groupby(digests).cumcount()
+    return "H" + digests + occurrence.map(lambda n: f"-{n}" if n else "")
+
+
+def assign_listing_ids(df):
+    """Give every row without a listing_id a stable content-hash id"""
+    df = df.copy()
+    if ID_COL not in df.columns:
+        df.insert(0, ID_COL, None)
+
+    missing = df[ID_COL].isna() | (df[ID_COL].astype(str) == "")
+    if missing.any():
+        df.loc[missing, ID_COL] = content_ids(df)[missing]
+
+    assert df[ID_COL].is_unique, "listing_id must be unique"
+    return df
+
+
+def attach_raw_columns(house_df, house_raw, columns):
+    """
+    Replace `columns` of the scored houses with the raw (unscaled) values.
+
+    The lookup is a 1:1 join on listing_id; it fails loudly instead of fanning out
+    when either side has duplicate ids.
+    """
+    assert house_raw[ID_COL].is_unique, "house_raw has duplicate listing_id values"
+    assert house_df[ID_COL].is_unique, "house_df has duplicate listing_id values"
+
+    columns = [c for c in columns if c in house_raw.columns]
+    raw = house_raw.set_index(ID_COL)[columns]
+
+    joined = house_df.drop(columns=columns, errors="ignore").join(raw, on=ID_COL)
+    assert len(joined) == len(house_df), "listing_id join changed the row count"
+    return joined
+
+
+def extract_geo_info(name):
+    """Return (location, district, state) parsed from a listing name such as 'A, B, State'"""
+    if pd.isna(name):
+        return None, None, None
+
+    parts = [p.strip() for p in name.split(',')]
+
+    #If the name is malformed
+    if len(parts) < 2:
+        return name, None, None
+
+    #If there are at least 3 parts, assume format "A, B, C" where B is district and C is state
+    if len(parts) >= 3:
+        district, state = parts[-2], parts[-1]
+    else:
+        district, state = parts[0], parts[-1]
+
+    if state not in MALAYSIA_STATES:
+        #Might be reversed or malformed
+        return name, district, None
+
+    return name, district, state
+
+
+def fill_geo_columns(df):
+    """
+    Return a copy of a scraped house frame with missing Location/District/State
+    filled from the listing name. Empty strings (fresh scrapes) count as missing.
+    """
+    df = df.copy()
+    parsed = [extract_geo_info(name) for name in df['Name']]
+    for col, values in [
+        ('Location', [loc for loc, _, _ in parsed]),
+        ('District', [d for _, d, _ in parsed]),
+        ('State', [s for _, _, s in parsed])
+    ]:
+        current = df[col].mask(df[col].astype(str).str.strip() == '')
+        df[col] = current.fillna(pd.Series(values, index=df.index, dtype=object))
+    return df
+
+
+def clean_house_table(df):
+    """
+    Cleaning steps of House_Rental_Analysis.ipynb: fill Location/District/State from
+    the listing name, drop rows still missing them and fill missing Facilities.
+    """
+    df = fill_geo_columns(df)
+    df = df.dropna(subset=['District', 'State', 'Location'])
+    df['Facilities'] = df['Facilities'].fillna('None')
+    return df
+
+
+def parse_house_numbers(df):
+    """Convert the score features to numbers and drop the listings missing any of them"""
+    df = df.copy()
+    df['Price'] = pd.to_numeric(df['Price'].astype(str).str.replace(',', ''), errors='coerce')
+    df['Size'] = pd.to_numeric(
+        df['Size'].astype(str).str.replace(',', '').str.replace(' sqft', '').str.replace('sqft', ''),
+        errors='coerce'
+    )
+    df['Number of beds'] = pd.to_numeric(df['Number of beds'], errors='coerce')
+    df['Number of bathrooms'] = pd.to_numeric(df['Number of bathrooms'], errors='coerce')
+    return df.dropna(subset=SCORE_FEATURES).reset_index(drop=True)
+
+
+def score_houses(df):
+    """
+    Return the min-max scaled score features with Price_inv and house_score
+    (0.35 Size + 0.25 beds + 0.15 baths + 0.25 inverted Price), as in house_scores.csv.
+    """
+    from sklearn.preprocessing import MinMaxScaler
+
+    df_norm = df.copy()
+    df_norm[SCORE_FEATURES] = MinMaxScaler().fit_transform(df[SCORE_FEATURES])
+    df_norm['Price_inv'] = 1 - df_norm['Price']
+    df_norm['house_score'] = (
+        0.35 * df_norm['Size'] +
+        0.25 * df_norm['Number of beds'] +
+        0.15 * df_norm['Number of bathrooms'] +
+        0.25 * df_norm['Price_inv']
+    )
+    return df_norm
+
+
+def encode_facilities(df):
+    """
+    Return a uint16 bitmask per listing built from the comma separated Facilities
+    text and the Public transport flag.
+    """
+    facilities = df["Facilities"].fillna("").astype(str) if "Facilities" in df.columns else pd.Series("", index=df.index)
+    mask = np.zeros(len(df), dtype=np.uint16)
+
+    for name, bit in FACILITY_BITS.items():
+        if name == "Public transport":
+            if name in df.columns:
+                has = df[name].astype(str).str.strip().str.lower() == "true"
+            else:
+                continue
+        else:
+            has = facilities.str.contains(rf"(?:^|,)\s*{re.escape(name)}\s*(?:,|$)", regex=True)
+        mask[has.to_numpy()] |= bit
+
+    return pd.Series(mask, index=df.index, name="facility_mask")
+
+
+def facilities_mask(names):
+    """Combine facility names into the bitmask required by a filter"""
+    mask = np.uint16(0)
+    for name in names:
+        mask |= FACILITY_BITS[name]
+    return mask
+
+
+def has_all_facilities(masks, names):
+    """Vectorised 'all of these facilities' test over a facility_mask column"""
+    required = facilities_mask(names)
+    return (masks.to_numpy(dtype=np.uint16) & required) == required
+
+
+def decode_facilities(mask):
+    return [name for name, bit in FACILITY_BITS.items() if mask & bit]
+
+
+def read_house_table(path):
+    """
+    Read a house CSV for the app with the Facilities text and Public transport flag
+    replaced by the compact facility_mask column.
+    """
+    columns = pd.read_csv(path, nrows=0).columns
+    if "facility_mask" not in columns:
+        df = pd.read_csv(path)
+        df["facility_mask"] = encode_facilities(df)
+        return df.drop(columns=["Facilities", "Public transport"], errors="ignore")
+
+    return pd.read_csv(
+        path,
+        usecols=lambda c: c not in ("Facilities", "Public transport"),
+        dtype={"facility_mask": np.uint16}
+    )
@@ -0,0 +1,107 @@
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from datetime import datetime
+
+from app_data import WARM_UP_ENV
+from load_test import APP_DIR, PAGES, REPORT_DIR, _git_commit
+
+#Runs one page in a fresh interpreter. Streamlit and AppTest are imported before the
+#marker, so the -X importtime lines after it are what the page itself costs a
+#server that is already up. The background warm-up is switched off: its imports
+#would land in the report depending on thread timing
+_PROBE = r"""
+import json, os, sys, time
+sys.path.insert(0, os.getcwd())
+import streamlit.logger
+from streamlit.testing.v1 import AppTest
+streamlit.logger.set_log_level("error")
+sys.stderr.write("--- page start ---\n")
+sys.stderr.flush()
+start = time.perf_counter()
+at = AppTest.from_file(os.path.abspath(sys.argv[1]), default_timeout=300).run()
+print(json.dumps({"first_run_ms": (time.perf_counter() - start) * 1000, "errors": len(at.exception)}))
+"""
+
+_IMPORT_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def parse_importtime(stderr):
+    """Return (total ms, {top-level package: self ms}) of the imports after the marker"""
+    lines = stderr.split("--- page start ---", 1)[-1].splitlines()
+
+    total_us = 0
+    by_package = defaultdict(int)
+    for line in lines:
+        match = _IMPORT_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        by_package[module.split(".")[0]] += int(self_us)
+        #Only modules imported directly (not by another module) add their cumulative time
+        if len(indent) == 1:
+            total_us += int(cumulative_us)
+
+    return total_us / 1000, {name: us / 1000 for name, us in by_package.items()}
+
+
+def measure_page(page, top=8):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE, page],
+        cwd=APP_DIR, capture_output=True, text=True, env={**os.environ, WARM_UP_ENV: "0"}
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{page} failed:\n{proc.stderr[-2000:]}")
+
+    run = json.loads(proc.stdout.strip().splitlines()[-1])
+    total_ms, by_package = parse_importtime(proc.stderr)
+    heaviest = sorted(by_package.items(), key=lambda item: -item[1])[:top]
+
+    return {
+        "page": page,
+        "import_ms": round(total_ms, 1),
+        "first_run_ms": round(run["first_run_ms"], 1),
+        "errors": run["errors"],
+        "modules": sum(1 for line in proc.stderr.split("--- page start ---", 1)[-1].splitlines()
+                       if _IMPORT_LINE.match(line)),
+        "heaviest_packages_ms": {name: round(ms, 1) for name, ms in heaviest},
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-page -X importtime report of the Streamlit pages")
+    parser.add_argument("--pages", nargs="+", default=PAGES)
+    parser.add_argument("--output", help=f"report path (default {REPORT_DIR}/<commit>-imports.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two saved reports")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f_old, open(args.compare[1]) as f_new:
+            old, new = json.load(f_old), json.load(f_new)
+        print(f"{old['commit']} -> {new['commit']}")
+        old_pages = {r["page"]: r for r in old["results"]}
+        for r in new["results"]:
+            before = old_pages.get(r["page"])
+            if before:
+                print(f"{r['page']:<36} imports {before['import_ms']:>7.0f} -> {r['import_ms']:>7.0f} ms  "
+                      f"first run {before['first_run_ms']:>7.0f} -> {r['first_run_ms']:>7.0f} ms")
+        sys.exit(0)
+
+    report = {"commit": _git_commit(), "created": datetime.now().isoformat(timespec="seconds"),
+              "python": sys.version.split()[0], "results": []}
+    for page in args.pages:
+        result = measure_page(page)
+        report["results"].append(result)
+        heaviest = ", ".join(f"{name} {ms:.0f}" for name, ms in list(result["heaviest_packages_ms"].items())[:4])
+        print(f"{page:<36} imports {result['import_ms']:>7.0f} ms ({result['modules']} modules)  "
+              f"first run {result['first_run_ms']:>7.0f} ms  [{heaviest}]", flush=True)
+
+    output = args.output or os.path.join(REPORT_DIR, f"{report['commit']}-imports.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved import time report to '{output}'")
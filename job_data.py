@@ -0,0 +1,166 @@
+import ast
+import re
+
+import pandas as pd
+
+#Mapping of state codes to state names in Malaysia (as in job_data_analysis.ipynb)
+STATE_CODE_MAP = {
+    'MY_KDH': 'Kedah',
+    'MY_PRK': 'Perak',
+    'MY_PLS': 'Perlis',
+    'MY_PNG': 'Pulau Pinang',
+    'MY_KTN': 'Kelantan',
+    'MY_TGG': 'Terengganu',
+    'MY_PHG': 'Pahang',
+    'MY_JHR': 'Johor',
+    'MY_SGR': 'Selangor',
+    'MY_KUL': 'W.P. Kuala Lumpur',
+    'MY_LBN': 'W.P. Labuan',
+    'MY_PJY': 'W.P. Putrajaya',
+    'MY_MLK': 'Melaka',
+    'MY_NSN': 'Negeri Sembilan',
+    'MY_SBH': 'Sabah',
+    'MY_SRW': 'Sarawak'
+}
+
+#Salaries above this are scraping errors and are dropped before scoring
+SALARY_OUTLIER_LIMIT = 500000
+
+#Weight of each contract type in job_score (unknown types get DEFAULT_CONTRACT_WEIGHT)
+CONTRACT_WEIGHT = {
+    "Permanent": 1.0,
+    "Contract": 0.75,
+    "Part-time": 0.5,
+    "Internship": 0.4,
+    "Temporary": 0.2,
+    "Apprenticeship": 0.15,
+    "Self-employed": 0.1
+}
+DEFAULT_CONTRACT_WEIGHT = 0.6
+
+EMBED_MODEL = "paraphrase-multilingual-mpnet-base-v2"
+
+
+def extract_state_district(location_str):
+    """Return (state, district) from a scraped MyFutureJobs location dict string"""
+    location_str = str(location_str)
+
+    #Extract state code
+    state_match = re.search(r"'STATE':\s*'([^']+)'", location_str)
+    state_code = state_match.group(1) if state_match else None
+    state = STATE_CODE_MAP.get(state_code, None)
+
+    #Extract city/district, format: MY_KDH_sungai_petani
+    city_match = re.search(r"'CITY':\s*'([^']+)'", location_str)
+    district = None
+    if city_match:
+        parts = city_match.group(1).split('_')
+        if len(parts) >= 3:
+            #Join all after state code as district name
+            district = '_'.join(parts[2:]).replace('_', ' ').title()
+    return state, district
+
+
+def parse_contract(s):
+    """Return (contract_type_name, contract_type_id) from a scraped contractType dict string"""
+    if pd.isna(s):
+        return None, None
+    try:
+        d = ast.literal_eval(s)
+        #Some rows could already be dicts or malformed strings
+        if isinstance(d, dict):
+            return d.get('name'), d.get('id')
+    except Exception:
+        #Fallback: try simple regex
+        name_match = re.search(r"'name':\s*'([^']+)'", str(s))
+        id_match = re.search(r"'id':\s*'([^']+)'", str(s))
+        return (name_match.group(1) if name_match else None,
+                id_match.group(1) if id_match else None)
+    return None, None
+
+
+def add_location_columns(df):
+    """Return a copy of a scraped job frame with state and district columns"""
+    df = df.copy()
+    parsed = [extract_state_district(loc) for loc in df['location']]
+    df['state'] = [state for state, _ in parsed]
+    df['district'] = [district for _, district in parsed]
+    return df
+
+
+def add_contract_columns(df):
+    """Return a copy of a scraped job frame with contract_type_name/contract_type_id"""
+    df = df.copy()
+    parsed = [parse_contract(c) for c in df['contractType']]
+    df['contract_type_name'] = [name for name, _ in parsed]
+    df['contract_type_id'] = [cid for _, cid in parsed]
+    #Normalize names a little
+    df['contract_type_name'] = df['contract_type_name'].str.strip().str.title().fillna('Unknown')
+    return df
+
+
+def categorize_salary(salary):
+    if salary < 1500:
+        return 'Less than 1500'
+    elif salary < 3000:
+        return '1500-3000'
+    elif salary < 4500:
+        return '3000-4500'
+    elif salary < 6000:
+        return '4500-6000'
+    elif salary < 7500:
+        return '6000-7500'
+    elif salary < 9000:
+        return '7500-9000'
+    else:
+        return 'More than 9000'
+
+
+def clean_job_table(df):
+    """
+    Drop the empty date_posted column and keep one row per near-duplicate cluster.
+    Rows scraped before dup_cluster_id existed are clustered here first.
+    """
+    from dedup import assign_duplicate_clusters
+
+    df = df.drop(columns=['date_posted'], errors='ignore')
+    if 'dup_cluster_id' not in df.columns or df['dup_cluster_id'].isna().any():
+        df = assign_duplicate_clusters(df)
+    return df.drop_duplicates(subset=['dup_cluster_id']).reset_index(drop=True)
+
+
+def parse_job_table(df):
+    """
+    Parse location and contract type, add salary_category and drop salary outliers,
+    in the order of job_data_analysis.ipynb.
+    """
+    df = add_contract_columns(add_location_columns(df))
+    df['contract_type_name'] = df['contract_type_name'].astype('category')
+    df['salary_category'] = df['salary'].apply(categorize_salary)
+    return df[~(df['salary'] > SALARY_OUTLIER_LIMIT)].reset_index(drop=True)
+
+
+def score_jobs(df, title_clusters):
+    """
+    Return the job table with salary_norm, title_cluster_score, contract_score and
+    job_score (25 salary + 10 title cluster salary + 0.2 contract), as in job_scores.csv.
+    """
+    from sklearn.preprocessing import MinMaxScaler
+
+    df_score = df.copy()
+    df_score['title_cluster'] = title_clusters
+    df_score['salary_norm'] = MinMaxScaler().fit_transform(df_score[['salary']])
+
+    #Cluster-level mean normalized salary mapped back to rows
+    cluster_salary_score = df_score.groupby('title_cluster')['salary_norm'].mean()
+    df_score['title_cluster_score'] = df_score['title_cluster'].map(cluster_salary_score)
+
+    df_score['contract_score'] = (
+        df_score['contract_type_name'].map(CONTRACT_WEIGHT).astype(float).fillna(DEFAULT_CONTRACT_WEIGHT)
+    )
+    df_score['job_score'] = (
+        25 * df_score['salary_norm'] +
+        10 * df_score['title_cluster_score'] +
+        0.20 * df_score['contract_score']
+    )
+    return df_score
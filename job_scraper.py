@@ -3,6 +3,10 @@ import pandas as pd
 import time
 import random
 import os
+from dedup import assign_duplicate_clusters
+from job_data import SALARY_OUTLIER_LIMIT, add_location_columns
+from quantile_sketch import ingest_sketches
+from snapshots import write_snapshot
 
 # CONFIGURATION
 BASE_URL = "https://candidates.myfuturejobs.gov.my/api/jobs?facets=CONTRACT_TYPE==2,CONTRACT_TYPE==3,CONTRACT_TYPE==4,CONTRACT_TYPE==5,CONTRACT_TYPE==6,CONTRACT_TYPE==7,EDUCATION==5,RECENCY==2WEEKSAGO,STATE==Selangor"
@@ -77,15 +81,38 @@ def scrape_myfuturejobs(keyword=SEARCH_KEYWORD, max_pages=MAX_PAGES):
     file_path = "jobs_myfuturejobs.csv"
 
     if not df_new.empty:
+        known_ids, known_clusters = set(), set()
         if os.path.exists(file_path):
             df_old = pd.read_csv(file_path, encoding="utf-8-sig")
+            known_ids = set(df_old["job_id"])
+            if "dup_cluster_id" in df_old.columns:
+                known_clusters = set(df_old["dup_cluster_id"].dropna())
             df_combined = pd.concat([df_old, df_new], ignore_index=True)
             df_combined.drop_duplicates(subset=["job_id"], inplace=True)
+            #Reposted vacancies get a new job_id, so group near-duplicates of the new rows
+            df_combined = assign_duplicate_clusters(df_combined)
             df_combined.to_csv(file_path, index=False, encoding="utf-8-sig")
-            print(f"\nMerged and saved total {len(df_combined)} unique jobs to '{file_path}'")
+            print(f"\nMerged and saved total {len(df_combined)} unique jobs "
+                  f"({df_combined['dup_cluster_id'].nunique()} distinct vacancies) to '{file_path}'")
         else:
-            df_new.to_csv(file_path, index=False, encoding="utf-8-sig")
-            print(f"\nSaved {len(df_new)} jobs to new file '{file_path}'")
+            df_combined = assign_duplicate_clusters(df_new)
+            df_combined.to_csv(file_path, index=False, encoding="utf-8-sig")
+            print(f"\nSaved {len(df_combined)} jobs to new file '{file_path}'")
+
+        #Keep an immutable, date-partitioned copy of every job seen in this run
+        snapshot = (
+            df_new.drop_duplicates(subset=["job_id"])
+            .merge(df_combined[["job_id", "dup_cluster_id"]], on="job_id", how="left")
+        )
+        snapshot_path = write_snapshot(snapshot, "jobs")[0]
+        print(f"Snapshot written to '{snapshot_path}'")
+
+        #Add the salaries of new vacancies to the district sketches until the pipeline rebuilds them
+        is_new = ~df_combined["job_id"].isin(known_ids) & ~df_combined["dup_cluster_id"].isin(known_clusters)
+        new_vacancies = add_location_columns(df_combined[is_new].drop_duplicates(subset=["dup_cluster_id"]))
+        new_vacancies["salary"] = pd.to_numeric(new_vacancies["salary"], errors="coerce")
+        if ingest_sketches(job_df=new_vacancies[~(new_vacancies["salary"] > SALARY_OUTLIER_LIMIT)]):
+            print(f"Added {len(new_vacancies)} new vacancies to the salary sketches")
     else:
         print("No new jobs were retrieved.")
 
@@ -0,0 +1,283 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+REPORT_DIR = "load_reports"
+PAGES = [
+    "Intro.py",
+    "pages/1_Main_Page.py",
+    "pages/2_Dashboard.py",
+    "pages/3_House_Recommendation.py",
+    "pages/4_Job_Recommendation.py",
+    "pages/5_District_Recommendation.py",
+]
+
+#Tables that grow with the scale factor and the id column that must stay unique
+SCALED_TABLES = {
+    "job_scores.csv": "job_id",
+    "house_scores.csv": "listing_id",
+    "house_data_cleaned.csv": "listing_id",
+}
+WIDGET_KINDS = ["slider", "selectbox", "multiselect", "radio", "text_input", "number_input", "checkbox"]
+TITLE_SEARCHES = ["", "engineer", "manager", "account", "sales", "executive", "clerk", "technician"]
+
+_IGNORE = shutil.ignore_patterns(".git", "__pycache__", "catboost_info", ".pipeline_cache", "*.ipynb", REPORT_DIR)
+
+
+def prepare_workspace(scale, dest):
+    """
+    Copy the app into `dest` with the scored tables resized to `scale` times their
+    rows. Extra copies get suffixed ids (e.g. 'M123~2'), so the listing_id joins
+    stay 1:1 while the districts, and therefore district_scores.csv, are unchanged.
+    """
+    shutil.copytree(APP_DIR, dest, ignore=_IGNORE, dirs_exist_ok=True)
+
+    for name, id_col in SCALED_TABLES.items():
+        path = os.path.join(dest, name)
+        if scale == 1 or not os.path.exists(path):
+            continue
+
+        #Read everything as text so the copied rows are written back unchanged
+        df = pd.read_csv(path, dtype=str, keep_default_na=False)
+        n = max(1, int(round(len(df) * scale)))
+        positions = np.arange(n)
+        scaled = df.iloc[positions % len(df)].reset_index(drop=True)
+        copy_no = positions // len(df)
+        if id_col in scaled.columns:
+            scaled[id_col] = [
+                value if c == 0 else f"{value}~{c}"
+                for value, c in zip(scaled[id_col], copy_no)
+            ]
+        scaled.to_csv(path, index=False)
+
+
+def _random_interaction(at, rng):
+    """Change one randomly chosen widget of the current page; return a short label"""
+    widgets = [(kind, w) for kind in WIDGET_KINDS for w in at.get(kind)]
+    if not widgets:
+        #Pages without widgets are still rerun, as when a user navigates back to them
+        return "rerun"
+
+    kind, w = rng.choice(widgets)
+    if kind == "slider":
+        lo, hi = w.min, w.max
+        is_int = isinstance(w.value[0] if isinstance(w.value, tuple) else w.value, int)
+        draw = (lambda: rng.randint(int(lo), int(hi))) if is_int else (lambda: round(rng.uniform(lo, hi), 2))
+        if isinstance(w.value, tuple):
+            w.set_range(*sorted((draw(), draw())))
+        else:
+            w.set_value(draw())
+    elif kind == "selectbox":
+        #Bias towards the "All" option so filters are switched off again as often as on
+        if "All" in w.options and rng.random() < 0.3:
+            w.select_index(list(w.options).index("All"))
+        else:
+            w.select_index(rng.randrange(len(w.options)))
+    elif kind == "multiselect":
+        w.set_value(rng.sample(list(w.options), rng.randint(0, min(2, len(w.options)))))
+    elif kind == "radio":
+        w.set_value(rng.choice(list(w.options)))
+    elif kind == "text_input":
+        w.input(rng.choice(TITLE_SEARCHES))
+    elif kind == "number_input":
+        w.set_value(rng.randint(int(w.min or 1), int(w.max or 1)))
+    elif kind == "checkbox":
+        w.set_value(not w.value)
+
+    return f"{kind}:{w.label}"
+
+
+def run_session(page, steps, seed, timeout=120):
+    """Drive one simulated user session and return its per-rerun records"""
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed)
+    at = AppTest.from_file(os.path.abspath(page), default_timeout=timeout)
+
+    records = []
+    start = time.perf_counter()
+    at.run()
+    records.append({"step": 0, "action": "first_run", "ms": (time.perf_counter() - start) * 1000,
+                    "error": bool(at.exception)})
+
+    for step in range(1, steps + 1):
+        action = _random_interaction(at, rng)
+        start = time.perf_counter()
+        at.run()
+        records.append({"step": step, "action": action, "ms": (time.perf_counter() - start) * 1000,
+                        "error": bool(at.exception)})
+
+    return records
+
+
+def _peak_rss_mb():
+    #ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _run_config(workspace, page, sessions, steps, seed, results_queue):
+    """Worker process: run `sessions` concurrent sessions against a fresh cache"""
+    os.chdir(workspace)
+    sys.path.insert(0, workspace)
+    #Deprecation notices are printed once per rerun and would bury the results
+    import streamlit.logger
+    streamlit.logger.set_log_level("error")
+    baseline_mb = _peak_rss_mb()
+
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        results = list(pool.map(lambda s: run_session(page, steps, seed + s), range(sessions)))
+
+    results_queue.put({"records": [r for records in results for r in records],
+               "baseline_rss_mb": baseline_mb, "peak_rss_mb": _peak_rss_mb()})
+
+
+def measure(workspace, page, sessions, steps, seed, timeout=600):
+    """
+    Run one (page, sessions) configuration in its own process, so every
+    configuration starts with cold st.cache_data caches and its own peak RSS.
+    A worker that crashes, or reports nothing within `timeout` seconds, raises
+    RuntimeError instead of hanging the run.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    results_queue = ctx.Queue()
+    process = ctx.Process(target=_run_config, args=(workspace, page, sessions, steps, seed, results_queue))
+    process.start()
+
+    #Poll so a worker that died before reporting is noticed right away
+    deadline = time.monotonic() + timeout
+    result = None
+    while result is None:
+        try:
+            result = results_queue.get(timeout=1)
+        except queue.Empty:
+            if not process.is_alive():
+                raise RuntimeError(f"Load test worker for {page} exited with code {process.exitcode}")
+            if time.monotonic() > deadline:
+                process.terminate()
+                process.join()
+                raise RuntimeError(f"Load test worker for {page} timed out after {timeout}s")
+    process.join()
+    if process.exitcode != 0:
+        raise RuntimeError(f"Load test worker for {page} exited with code {process.exitcode}")
+
+    records = result["records"]
+    first = [r["ms"] for r in records if r["action"] == "first_run"]
+    reruns = np.array([r["ms"] for r in records if r["action"] != "first_run"])
+
+    return {
+        "page": page,
+        "sessions": sessions,
+        "reruns": len(reruns),
+        "first_run_ms": round(float(np.mean(first)), 1),
+        "p50_ms": round(float(np.percentile(reruns, 50)), 1),
+        "p95_ms": round(float(np.percentile(reruns, 95)), 1),
+        "p99_ms": round(float(np.percentile(reruns, 99)), 1),
+        "max_ms": round(float(np.max(reruns)), 1),
+        "peak_rss_mb": round(result["peak_rss_mb"], 1),
+        "rss_growth_mb": round(result["peak_rss_mb"] - result["baseline_rss_mb"], 1),
+        "errors": int(sum(r["error"] for r in records)),
+        "slowest": sorted(records, key=lambda r: -r["ms"])[:3],
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=APP_DIR, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_load_test(pages=PAGES, scales=(1,), sessions=(1, 4), steps=20, seed=0, timeout=600):
+    """Measure every page at every scale factor and session count and return the report"""
+    import streamlit
+
+    report = {
+        "commit": _git_commit(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "streamlit": streamlit.__version__,
+        "pandas": pd.__version__,
+        "steps": steps,
+        "seed": seed,
+        "results": [],
+    }
+
+    for scale in scales:
+        with tempfile.TemporaryDirectory(prefix=f"load_x{scale}_") as workspace:
+            prepare_workspace(scale, workspace)
+            for page in pages:
+                for n in sessions:
+                    result = {"scale": scale, **measure(workspace, page, n, steps, seed, timeout)}
+                    report["results"].append(result)
+                    print(_format_row(result), flush=True)
+
+    return report
+
+
+def _format_row(r):
+    return (f"{r['page']:<36} x{r['scale']:<4} {r['sessions']:>2} sess  "
+            f"first {r['first_run_ms']:>8.0f}  p50 {r['p50_ms']:>7.0f}  p95 {r['p95_ms']:>7.0f}  "
+            f"p99 {r['p99_ms']:>7.0f} ms  rss {r['peak_rss_mb']:>6.0f} MB  errors {r['errors']}")
+
+
+def compare_reports(old, new):
+    """Return the p50/p95/p99 and memory change of every configuration in both reports"""
+    key_cols = ["page", "scale", "sessions"]
+    value_cols = ["first_run_ms", "p50_ms", "p95_ms", "p99_ms", "peak_rss_mb"]
+    merged = pd.DataFrame(old["results"])[key_cols + value_cols].merge(
+        pd.DataFrame(new["results"])[key_cols + value_cols],
+        on=key_cols,
+        suffixes=("_old", "_new")
+    )
+    for col in value_cols:
+        merged[f"{col}_change_%"] = (100 * (merged[f"{col}_new"] / merged[f"{col}_old"] - 1)).round(1)
+    return merged
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless AppTest load test of the Streamlit pages")
+    parser.add_argument("--pages", nargs="+", default=PAGES)
+    parser.add_argument("--scales", nargs="+", type=float, default=[1])
+    parser.add_argument("--sessions", nargs="+", type=int, default=[1, 4])
+    parser.add_argument("--steps", type=int, default=20, help="random interactions per session")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=int, default=600, help="seconds allowed per configuration")
+    parser.add_argument("--output", help=f"report path (default {REPORT_DIR}/<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two saved reports")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f_old, open(args.compare[1]) as f_new:
+            old, new = json.load(f_old), json.load(f_new)
+        print(f"{old['commit']} -> {new['commit']}")
+        with pd.option_context("display.width", 200, "display.max_columns", None):
+            print(compare_reports(old, new).to_string(index=False))
+        sys.exit(0)
+
+    scales = [int(s) if float(s).is_integer() else s for s in args.scales]
+    report = run_load_test(args.pages, scales, args.sessions, args.steps, args.seed, args.timeout)
+
+    output = args.output or os.path.join(REPORT_DIR, f"{report['commit']}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved load test report to '{output}'")
@@ -1,9 +1,12 @@
 import streamlit as st
-import pandas as pd
-from recommender import (
-    recommend_districts,
-    highest_lowest_salary_districts,
-    highest_lowest_house_price
+from app_data import (
+    load_job_scores,
+    load_house_scores,
+    load_house_raw,
+    load_district_scores,
+    load_quantile_sketches,
+    load_district_skyline,
+    start_warm_up
 )
 
 st.set_page_config(
@@ -13,34 +16,67 @@ st.set_page_config(
 
 st.title("Malaysia District Living Recommendation System")
 
-#Load data
-@st.cache_data
-def load_data():
-    job_df = pd.read_csv("job_scores.csv")
-    house_df = pd.read_csv("house_scores.csv")
-    district_df = pd.read_csv("district_scores.csv")
-    #Load raw house data for accurate price averages/display
+from recommender import (
+    recommend_districts,
+    highest_lowest_salary_districts,
+    highest_lowest_house_price,
+    rename_columns_for_display
+)
+
+with st.spinner("Loading data..."):
+    job_df = load_job_scores()
+    house_df = load_house_scores()
+    district_df = load_district_scores()
+    #Raw house data for accurate price averages/display
     try:
-        house_raw = pd.read_csv("house_data_cleaned.csv")
-    except Exception:
+        house_raw = load_house_raw()
+    except FileNotFoundError:
         house_raw = None
-    return job_df, house_df, district_df, house_raw
+    #Per-district salary/rent sketches (built by quantile_sketch.py); rankings fall back to raw rows without them
+    sketches = load_quantile_sketches()
 
-job_df, house_df, district_df, house_raw = load_data()
+stat_options = {
+    "Average": "mean",
+    "Median": "median",
+    "75th Percentile": "p75",
+    "90th Percentile": "p90"
+}
 
 #Section 1: Top Districts to Live
 st.header("Top 5 Recommended Districts to Live")
 
-job_weight = st.slider("Job importance", 0.0, 1.0, 0.5)
-house_weight = 1 - job_weight
-
-top_districts = recommend_districts(
-    district_df,
-    job_weight=job_weight,
-    house_weight=house_weight
+ranking_mode = st.radio(
+    "Rank districts by",
+    ["Weighted score", "Pareto skyline"],
+    horizontal=True,
+    key="ranking_mode"
 )
 
-st.dataframe(top_districts)
+if ranking_mode == "Weighted score":
+    job_weight = st.slider("Job importance", 0.0, 1.0, 0.5)
+    house_weight = 1 - job_weight
+
+    top_districts = recommend_districts(
+        district_df,
+        job_weight=job_weight,
+        house_weight=house_weight
+    )
+
+    st.dataframe(top_districts)
+else:
+    skyline_df = load_district_skyline()
+    st.caption(
+        "Layer 1 lists every district that no other district beats on job score, house score, "
+        "median salary, median rent and the number of jobs and houses at once. Each further "
+        "layer is the best trade-off once the layers above it are removed."
+    )
+    max_layer = int(skyline_df["skyline_layer"].max())
+    layers_to_show = st.slider("Skyline layers to show", 1, max_layer, 1) if max_layer > 1 else 1
+
+    st.dataframe(
+        rename_columns_for_display(skyline_df[skyline_df["skyline_layer"] <= layers_to_show]),
+        hide_index=True
+    )
 
 #Section 2: Salary-based District Ranking
 st.header("Salary Ranking by District")
@@ -51,9 +87,18 @@ salary_mode = st.radio(
     horizontal=True
 )
 
+salary_stat = st.radio(
+    "Salary statistic",
+    list(stat_options),
+    horizontal=True,
+    key="salary_stat"
+)
+
 salary_rank = highest_lowest_salary_districts(
     job_df,
-    mode=salary_mode
+    mode=salary_mode,
+    stat=stat_options[salary_stat],
+    sketches=sketches
 )
 
 st.dataframe(salary_rank)
@@ -71,11 +116,22 @@ price_mode = st.radio(
     key="price_mode"
 )
 
+price_stat = st.radio(
+    "Rental price statistic",
+    list(stat_options),
+    horizontal=True,
+    key="price_stat"
+)
+
 house_rank = highest_lowest_house_price(
     house_df,
     house_type=None if selected_type == "All" else selected_type,
     mode=price_mode,
-    house_raw_df=house_raw
+    house_raw_df=house_raw,
+    stat=stat_options[price_stat],
+    sketches=sketches
 )
 
 st.dataframe(house_rank)
+
+start_warm_up()
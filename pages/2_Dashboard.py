@@ -1,19 +1,20 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+from app_data import data_version, load_job_scores, load_house_raw, load_quantile_sketches, start_warm_up
 
 st.set_page_config(layout="wide")
 
 st.title("📊 Malaysia Living Data Dashboard")
 
-@st.cache_data
-def load_data():
-    jobs = pd.read_csv("job_scores.csv")
-    houses = pd.read_csv("house_data_cleaned.csv")
-    return jobs, houses
+#Plotly and pandas load after the title is on screen
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from quantile_sketch import SKETCHES_PATH
+from snapshots import trend
 
-job_df, house_df = load_data()
+with st.spinner("Loading data..."):
+    job_df = load_job_scores()
+    house_df = load_house_raw()
 
 #Column rename mapping for display
 column_rename = {
@@ -91,7 +92,28 @@ if selected_furnished is not None:
     house_df_f = house_df_f[house_df_f["Furnished Status"].isin(selected_furnished)]
 if selected_house_types is not None:
     house_df_f = house_df_f[house_df_f["Type"].isin(selected_house_types)]
-job_tab, house_tab = st.tabs(["Job Dashboard", "House Dashboard"]) 
+
+#Medians are read from the per-district quantile sketches merged over the selected
+#states; other filters are not sketched, so those cases fall back to the raw rows.
+#The sketch file's mtime is part of the key, so sketches updated at ingest show up
+@st.cache_data
+def sketch_median(metric, states, version):
+    sketches = load_quantile_sketches()
+    if sketches is None:
+        return None
+    return sketches[metric].rollup(set(states)).quantile(0.5)
+
+def filtered_median(metric, values, state_only):
+    median = sketch_median(metric, tuple(selected_states), data_version(SKETCHES_PATH)) if state_only else None
+    return values.median() if median is None else median
+
+job_state_only = selected_contracts is None or len(selected_contracts) == job_df["contract_type_name"].nunique()
+house_state_only = (
+    (selected_furnished is None or len(selected_furnished) == house_df["Furnished Status"].nunique()) and
+    (selected_house_types is None or len(selected_house_types) == house_df["Type"].nunique())
+)
+
+job_tab, house_tab, trend_tab = st.tabs(["Job Dashboard", "House Dashboard", "Market Trends"])
 
 with job_tab:
     #Dashboard 1: Job Dashboard
@@ -106,6 +128,7 @@ with job_tab:
     with col1:
         st.metric("Total Number of Jobs", f"{len(job_df_f):,}")
         st.metric("Average Salary (RM)", f"{job_df_f['salary'].mean():,.2f}")
+        st.metric("Median Salary (RM)", f"{filtered_median('salary', job_df_f['salary'], job_state_only):,.2f}")
 
     #Jobs by State
     jobs_by_state = (
@@ -185,7 +208,9 @@ with house_tab:
     with col5:
         st.metric("Total House Rentals", f"{len(house_df_f):,}")
         st.metric("Average Rental Price (RM)", f"{house_df_f['Price'].mean():,.2f}")
+        st.metric("Median Rental Price (RM)", f"{filtered_median('rent', house_df_f['Price'], house_state_only):,.2f}")
         st.metric("Average House Size (sqft)", f"{house_df_f['Size'].mean():,.2f}")
+        st.metric("Median House Size (sqft)", f"{filtered_median('size', house_df_f['Size'], house_state_only):,.2f}")
         
     #Furnished Status
     furnish_counts = (
@@ -305,4 +330,60 @@ with house_tab:
         color_continuous_scale="Purples"
     )
 
-    st.plotly_chart(fig_price_state, use_container_width=True)
\ No newline at end of file
+    st.plotly_chart(fig_price_state, use_container_width=True)
+
+#Trend queries only read the pre-aggregated snapshot partitions inside the window
+@st.cache_data(ttl=600)
+def load_trend(dataset, metric, stat, state, district, weeks):
+    return trend(dataset, metric, stat=stat, state=state, district=district, weeks=weeks)
+
+with trend_tab:
+    #Dashboard 3: Market Trends across scrape snapshots
+    st.markdown(
+        "<h2 style='text-align: center;'>📈 Market Trends</h2>",
+        unsafe_allow_html=True
+    )
+
+    trend_metrics = {
+        "Salary (RM)": ("jobs", "salary", job_df, "state", "district"),
+        "Rental Price (RM)": ("houses", "Price", house_df, "State", "District"),
+        "House Size (sqft)": ("houses", "Size", house_df, "State", "District"),
+    }
+
+    col7, col8, col9 = st.columns(3)
+    with col7:
+        trend_metric = st.selectbox("Metric", list(trend_metrics))
+        dataset, metric, source_df, state_col, district_col = trend_metrics[trend_metric]
+    with col8:
+        trend_state = st.selectbox("State", ["All"] + sorted(source_df[state_col].dropna().astype(str).unique()), key="trend_state")
+    with col9:
+        district_opts = source_df.loc[source_df[state_col] == trend_state, district_col] if trend_state != "All" else source_df[district_col]
+        trend_district = st.selectbox("District", ["All"] + sorted(district_opts.dropna().astype(str).unique()), key="trend_district")
+
+    trend_stat = st.radio("Statistic", ["Median", "Average"], horizontal=True, key="trend_stat")
+    trend_weeks = st.slider("Weeks", 4, 52, 8)
+
+    trend_df = load_trend(
+        dataset,
+        metric,
+        "median" if trend_stat == "Median" else "mean",
+        None if trend_state == "All" else trend_state,
+        None if trend_district == "All" else trend_district,
+        trend_weeks
+    )
+
+    if trend_df.empty:
+        st.info("No scrape snapshots in this window yet. They are written by job_scraper.py and the Mudah scraper on every run.")
+    else:
+        fig_trend = px.line(
+            trend_df,
+            x="period",
+            y="value",
+            markers=True,
+            hover_data=["count"],
+            title=f"Weekly {trend_stat} {trend_metric}",
+            labels={"period": "Week", "value": trend_metric, "count": "Listings"}
+        )
+        st.plotly_chart(fig_trend, use_container_width=True)
+
+start_warm_up()
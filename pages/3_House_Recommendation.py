@@ -1,5 +1,6 @@
 import streamlit as st
-import pandas as pd
+from app_data import HOUSE_RAW_PATH, HOUSE_SCORES_PATH, data_version, load_house_scores, load_house_raw, start_warm_up
+from pagination import paginated_dataframe
 
 st.set_page_config(
     page_title="Malaysia District Living Recommendation System",
@@ -10,11 +11,12 @@ st.title("Malaysia District Living Recommendation System")
 
 st.header("🏠 House Rental Recommendation System")
 
-@st.cache_data
-def load_houses():
-    return (pd.read_csv("house_scores.csv"), pd.read_csv("house_data_cleaned.csv"))
+import pandas as pd
+from house_data import attach_raw_columns, has_all_facilities, FACILITIES
 
-house_df, house_raw = load_houses()
+with st.spinner("Loading houses..."):
+    house_df = load_house_scores()
+    house_raw = load_house_raw()
 
 #Column rename mapping
 column_rename = {
@@ -61,75 +63,72 @@ baths_max = int(house_raw["Number of bathrooms"].max()) if "Number of bathrooms"
 beds = st.slider("Minimum Bedrooms", 0, beds_max, 0)
 baths = st.slider("Minimum Bathrooms", 0, baths_max, 0)
 
+facilities = st.multiselect("Must have all of these facilities", FACILITIES)
+
 top_n = st.selectbox("Results to show", [5, "All"])
 
-#Start from scored dataframe, then merge raw columns for display and accurate filtering
-df = house_df.copy()
-
-#Prepare raw selection and merge on identifying columns (Name, State, District)
-raw_sel_cols = [c for c in ["Name", "Price", "Size", "Number of beds", "Number of bathrooms", "Type", "Furnished Status", "State", "District"] if c in house_raw.columns]
-raw_sel = house_raw[raw_sel_cols].copy()
-
-#Rename raw measurement columns to keep them distinct before replacing
-rename_map = {}
-for c in ["Price", "Size", "Number of beds", "Number of bathrooms", "Type", "Furnished Status"]:
-    if c in raw_sel.columns:
-        rename_map[c] = f"{c}_raw"
-raw_sel = raw_sel.rename(columns=rename_map)
-
-merge_on = [col for col in ["Name", "State", "District"] if col in df.columns and col in raw_sel.columns]
-if merge_on:
-    df = df.merge(raw_sel, on=merge_on, how="left")
-else:
-    #Fallback: attach raw columns by index if lengths match
-    if df.shape[0] == raw_sel.shape[0]:
-        df = df.reset_index(drop=True).join(raw_sel.reset_index(drop=True))
-
-#Replace base columns with raw values when present
-base_cols = ["Price", "Size", "Number of beds", "Number of bathrooms", "Type", "Furnished Status"]
-for col in base_cols:
-    raw_col = f"{col}_raw"
-    if raw_col in df.columns:
-        df[col] = df[raw_col]
-        df = df.drop(columns=[raw_col])
-
-#Apply filters against the (now raw-backed) display columns
-if state != "All":
-    df = df[df["State"] == state]
-
-if district != "All":
-    df = df[df["District"] == district]
-
-if house_type != "All":
-    df = df[df["Type"] == house_type]
-
-if furnished != "All":
-    df = df[df["Furnished Status"] == furnished]
-
-#Ensure numeric columns exist before filtering
-if "Price" in df.columns:
-    df["Price"] = pd.to_numeric(df["Price"], errors="coerce")
-if "Number of beds" in df.columns:
-    df["Number of beds"] = pd.to_numeric(df["Number of beds"], errors="coerce")
-if "Number of bathrooms" in df.columns:
-    df["Number of bathrooms"] = pd.to_numeric(df["Number of bathrooms"], errors="coerce")
-
-df = df[
-    (df.get("Price", 0) >= price_range[0]) &
-    (df.get("Price", 0) <= price_range[1]) &
-    (df.get("Number of beds", 0) >= beds) &
-    (df.get("Number of bathrooms", 0) >= baths)
-]
-
-#Sort by the scored house_score (descending)
-df = df.sort_values("house_score", ascending=False)
-
-if top_n != "All":
-    df = df.head(top_n)
+#Start from scored dataframe, then replace the scaled measurement columns with
+#raw values for display and accurate filtering (1:1 listing_id lookup)
+df = attach_raw_columns(
+    house_df,
+    house_raw,
+    ["Price", "Size", "Number of beds", "Number of bathrooms", "Type", "Furnished Status"]
+)
+
+#Filtering and sorting are cached, so paging through results does not redo them. Hashing
+#the frame would cost more than filtering it, so it is keyed on the data files' mtimes
+@st.cache_data(max_entries=64)
+def filter_houses(_df, version, state, district, house_type, furnished, price_range, beds, baths, facilities):
+    """Return the positional row order of matching houses, highest house_score first"""
+    df = _df.reset_index(drop=True)
+
+    #Apply filters against the (now raw-backed) display columns
+    if state != "All":
+        df = df[df["State"] == state]
+
+    if district != "All":
+        df = df[df["District"] == district]
+
+    if house_type != "All":
+        df = df[df["Type"] == house_type]
+
+    if furnished != "All":
+        df = df[df["Furnished Status"] == furnished]
+
+    #Bitwise test against the per-listing facility bitmask
+    if facilities:
+        df = df[has_all_facilities(df["facility_mask"], facilities)]
+
+    #Ensure numeric columns exist before filtering
+    if "Price" in df.columns:
+        df["Price"] = pd.to_numeric(df["Price"], errors="coerce")
+    if "Number of beds" in df.columns:
+        df["Number of beds"] = pd.to_numeric(df["Number of beds"], errors="coerce")
+    if "Number of bathrooms" in df.columns:
+        df["Number of bathrooms"] = pd.to_numeric(df["Number of bathrooms"], errors="coerce")
+
+    df = df[
+        (df.get("Price", 0) >= price_range[0]) &
+        (df.get("Price", 0) <= price_range[1]) &
+        (df.get("Number of beds", 0) >= beds) &
+        (df.get("Number of bathrooms", 0) >= baths)
+    ]
+
+    #Sort by the scored house_score (descending)
+    return df.sort_values("house_score", ascending=False).index.to_numpy()
+
+df = df.reset_index(drop=True)
+order = filter_houses(
+    df, data_version(HOUSE_SCORES_PATH, HOUSE_RAW_PATH),
+    state, district, house_type, furnished, price_range, beds, baths, tuple(facilities)
+)
 
 st.subheader("Recommended Houses")
-st.dataframe(
-    df[[
+paginated_dataframe(
+    df,
+    key="houses",
+    order=order,
+    columns=[
         "Name",
         "Price",
         "Size",
@@ -140,5 +139,9 @@ st.dataframe(
         "State",
         "District",
         "house_score"
-    ]].rename(columns=column_rename)
-)
\ No newline at end of file
+    ],
+    rename_columns=column_rename,
+    limit=None if top_n == "All" else top_n
+)
+
+start_warm_up()
@@ -1,5 +1,6 @@
 import streamlit as st
-import pandas as pd
+from app_data import JOB_SCORES_PATH, data_version, load_job_scores, start_warm_up
+from pagination import paginated_dataframe
 
 st.set_page_config(
     page_title="Malaysia District Living Recommendation System",
@@ -10,11 +11,8 @@ st.title("Malaysia District Living Recommendation System")
 
 st.header("💼 Job Recommendation System")
 
-@st.cache_data
-def load_jobs():
-    return pd.read_csv("job_scores.csv")
-
-job_df = load_jobs()
+with st.spinner("Loading jobs..."):
+    job_df = load_job_scores()
 
 #Column rename mapping
 column_rename = {
@@ -49,38 +47,49 @@ salary_range = st.slider(
 
 top_n = st.selectbox("Results to show", [5, 10, "All"])
 
-df = job_df.copy()
+#Filtering and sorting are cached, so paging through results does not redo them. Hashing
+#the frame would cost more than filtering it, so it is keyed on the data file's mtime
+@st.cache_data(max_entries=64)
+def filter_jobs(_job_df, version, title_search, state, district, contract, salary_range):
+    """Return the positional row order of matching jobs, highest job_score first"""
+    df = _job_df.reset_index(drop=True)
 
-if title_search:
-    df = df[df["title"].str.contains(title_search, case=False, na=False)]
+    if title_search:
+        df = df[df["title"].str.contains(title_search, case=False, na=False)]
 
-if state != "All":
-    df = df[df["state"] == state]
+    if state != "All":
+        df = df[df["state"] == state]
 
-if district != "All":
-    df = df[df["district"] == district]
+    if district != "All":
+        df = df[df["district"] == district]
 
-if contract != "All":
-    df = df[df["contract_type_name"] == contract]
+    if contract != "All":
+        df = df[df["contract_type_name"] == contract]
 
-df = df[
-    (df["salary"] >= salary_range[0]) &
-    (df["salary"] <= salary_range[1])
-]
+    df = df[
+        (df["salary"] >= salary_range[0]) &
+        (df["salary"] <= salary_range[1])
+    ]
 
-df = df.sort_values("job_score", ascending=False)
+    return df.sort_values("job_score", ascending=False).index.to_numpy()
 
-if top_n != "All":
-    df = df.head(top_n)
+order = filter_jobs(job_df, data_version(JOB_SCORES_PATH), title_search, state, district, contract, salary_range)
 
 st.subheader("Recommended Jobs")
-st.dataframe(
-    df[[
+paginated_dataframe(
+    job_df,
+    key="jobs",
+    order=order,
+    columns=[
         "title",
         "salary",
         "contract_type_name",
         "state",
         "district",
         "job_score"
-    ]].rename(columns=column_rename)
+    ],
+    rename_columns=column_rename,
+    limit=None if top_n == "All" else top_n
 )
+
+start_warm_up()
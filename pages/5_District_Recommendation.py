@@ -1,6 +1,16 @@
 import streamlit as st
-import pandas as pd
-from recommender import recommend_districts, rename_columns_for_display
+from app_data import (
+    HOUSE_RAW_PATH,
+    HOUSE_SCORES_PATH,
+    JOB_SCORES_PATH,
+    data_version,
+    load_job_scores,
+    load_house_scores,
+    load_house_raw,
+    load_district_scores,
+    start_warm_up
+)
+from pagination import paginated_dataframe
 
 st.set_page_config(
     page_title="Malaysia District Living Recommendation System",
@@ -11,16 +21,19 @@ st.title("Malaysia District Living Recommendation System")
 
 st.header("🌏 District Recommendation by District & State")
 
-@st.cache_data
-def load_data():
-    return (
-        pd.read_csv("district_scores.csv"),
-        pd.read_csv("job_scores.csv"),
-        pd.read_csv("house_scores.csv"),
-        pd.read_csv("house_data_cleaned.csv")
-    )
+import pandas as pd
+from house_data import attach_raw_columns
+from recommender import (
+    recommend_districts,
+    affordable_job_house_pairs,
+    skyline_job_house_pairs
+)
 
-district_df, job_df, house_df, house_raw = load_data()
+with st.spinner("Loading data..."):
+    district_df = load_district_scores()
+    job_df = load_job_scores()
+    house_df = load_house_scores()
+    house_raw = load_house_raw()
 
 # Column rename mapping
 column_rename = {
@@ -30,9 +43,70 @@ column_rename = {
     'state': 'State',
     'district': 'District',
     'job_score': 'Job Score',
-    'house_score': 'House Score'
+    'house_score': 'House Score',
+    'rent_ratio': 'Rent / Salary',
+    'pair_score': 'Pair Score',
+    'skyline_layer': 'Skyline Layer'
 }
 
+#Pairing and per-district sorting are cached, so paging through a district's results does
+#not redo them. Like the house and job pages, they are keyed on the data files' mtimes
+@st.cache_data(max_entries=64)
+def district_pairs(_job_df, _house_df, _house_raw, version, pair_mode, rent_share, job_weight, house_weight, districts):
+    """Return the affordable job/house pairs of `districts` for the chosen ranking"""
+    if pair_mode == "Pair score":
+        return affordable_job_house_pairs(
+            _job_df,
+            _house_df,
+            rent_share=rent_share,
+            mode="district",
+            job_weight=job_weight,
+            house_weight=house_weight,
+            districts=list(districts),
+            house_raw_df=_house_raw
+        )
+    #Pairs no other affordable pair beats on job score, salary, house score and rent at once
+    return skyline_job_house_pairs(
+        _job_df,
+        _house_df,
+        rent_share=rent_share,
+        districts=list(districts),
+        house_raw_df=_house_raw
+    )
+
+
+@st.cache_data(max_entries=64)
+def district_rows(_job_df, _house_df, _house_raw, version, districts):
+    """
+    Return the raw-backed houses of `districts` and, per district, the positional row
+    orders of its jobs (in the job table) and houses (in that frame), best score first.
+    """
+    jobs = _job_df.reset_index(drop=True)
+    house_parts, job_orders = [], []
+    for state, district in districts:
+        job_orders.append(
+            jobs[(jobs["state"] == state) & (jobs["district"] == district)]
+            .sort_values("job_score", ascending=False)
+            .index.to_numpy()
+        )
+        house_parts.append(
+            _house_df[(_house_df["State"] == state) & (_house_df["District"] == district)]
+            .sort_values("house_score", ascending=False)
+        )
+
+    #Replace scaled columns of the selected houses with raw cleaned values (1:1 listing_id lookup)
+    houses = attach_raw_columns(
+        pd.concat(house_parts),
+        _house_raw,
+        ["Price", "Size", "Number of beds", "Number of bathrooms", "Type", "Furnished Status"]
+    )
+
+    orders, start = {}, 0
+    for place, job_order, part in zip(districts, job_orders, house_parts):
+        orders[place] = (job_order, range(start, start + len(part)))
+        start += len(part)
+    return houses, orders
+
 job_weight = st.slider("Job importance", 0.0, 1.0, 0.5)
 house_weight = 1 - job_weight
 
@@ -48,57 +122,58 @@ st.dataframe(top_places)
 houses_to_show = st.selectbox("Houses to show", [5, "All"]) 
 jobs_to_show = st.selectbox("Jobs to show", [5, "All"]) 
 
+#Pair jobs with houses whose rent fits within the chosen share of the salary
+rent_share = st.slider("Maximum rent as share of salary", 0.1, 1.0, 0.3, 0.05)
+pair_mode = st.radio("Rank pairs by", ["Pair score", "Pareto skyline"], horizontal=True, key="pair_mode")
+
+version = data_version(JOB_SCORES_PATH, HOUSE_SCORES_PATH, HOUSE_RAW_PATH)
+districts = tuple(zip(top_places["State"], top_places["District"]))
+affordable_pairs = district_pairs(
+    job_df, house_df, house_raw, version, pair_mode, rent_share, job_weight, house_weight, districts
+)
+if pair_mode == "Pair score":
+    pair_cols = ["title", "salary", "Name", "Price", "rent_ratio", "pair_score"]
+else:
+    pair_cols = ["title", "salary", "job_score", "Name", "Price", "house_score", "rent_ratio"]
+
+houses, district_orders = district_rows(job_df, house_df, house_raw, version, districts)
+
 for _, row in top_places.iterrows():
     st.markdown(f"### 📍 {row['District']}, {row['State']}")
+    job_order, house_order = district_orders[(row["State"], row["District"])]
+
+    district_key = f"{row['State']}_{row['District']}"
 
-    jobs = (
-        job_df[
-            (job_df["state"] == row["State"]) &
-            (job_df["district"] == row["District"])
-        ]
-        .sort_values("job_score", ascending=False)
-    )
-    
-    houses = (
-        house_df[
-            (house_df["State"] == row["State"]) &
-            (house_df["District"] == row["District"]) 
-        ]
-        .sort_values("house_score", ascending=False)
-    )
-    #Merge selected top scored houses with raw cleaned data so display shows raw values
-    if not houses.empty and isinstance(house_raw, pd.DataFrame):
-        #Prefer merging on Name + State + District when available
-        if {"Name", "State", "District"}.issubset(house_raw.columns):
-            houses = houses.merge(
-                house_raw,
-                on=["Name", "State", "District"],
-                how="left",
-                suffixes=("_scaled", "")
-            )
-        elif "Name" in house_raw.columns:
-            houses = houses.merge(house_raw, on=["Name"], how="left", suffixes=("_scaled", ""))
-
-        #After merge, drop scaled columns (those with _scaled) or prefer raw values
-        for col in ["Price", "Size", "Number of beds", "Number of bathrooms", "Type", "Furnished Status"]:
-            scaled_col = f"{col}_scaled"
-            if scaled_col in houses.columns and col in houses.columns:
-                #Raw column (from house_raw) is present and scaled version exists: drop scaled
-                houses = houses.drop(columns=[scaled_col])
-            elif scaled_col in houses.columns and col not in houses.columns:
-                #Only scaled exists: rename to base name for display
-                houses = houses.rename(columns={scaled_col: col})
-
-    if houses_to_show != "All":
-        houses = houses.head(int(houses_to_show))
-        
-    if jobs_to_show != "All":
-        jobs = jobs.head(int(jobs_to_show))
-        
     st.markdown("**Top Jobs**")
-    st.dataframe(jobs[["title", "salary", "contract_type_name", "job_score"]].rename(columns=column_rename))
+    paginated_dataframe(
+        job_df,
+        key=f"jobs_{district_key}",
+        order=job_order,
+        columns=["title", "salary", "contract_type_name", "job_score"],
+        rename_columns=column_rename,
+        limit=None if jobs_to_show == "All" else int(jobs_to_show)
+    )
 
     st.markdown("**Top Houses**")
     #Ensure the display columns exist after merging; fall back to available ones
     display_cols = [c for c in ["Name", "Size", "Price", "Number of beds", "Number of bathrooms", "Type", "house_score"] if c in houses.columns]
-    st.dataframe(houses[display_cols].rename(columns=column_rename))
+    paginated_dataframe(
+        houses,
+        key=f"houses_{district_key}",
+        order=house_order,
+        columns=display_cols,
+        rename_columns=column_rename,
+        limit=None if houses_to_show == "All" else int(houses_to_show)
+    )
+
+    st.markdown("**Affordable Job & House Pairs**")
+    pairs = affordable_pairs[
+        (affordable_pairs["state"] == row["State"]) &
+        (affordable_pairs["district"] == row["District"])
+    ]
+    if pairs.empty:
+        st.info("No house in this district is affordable at the selected rent share.")
+    else:
+        st.dataframe(pairs[pair_cols].rename(columns=column_rename))
+
+start_warm_up()
@@ -0,0 +1,49 @@
+import math
+
+import streamlit as st
+
+PAGE_SIZE = 25
+
+
+def paginated_dataframe(df, key, order=None, columns=None, rename_columns=None, limit=None, page_size=PAGE_SIZE):
+    """
+    Show the rows of `df` one page at a time.
+
+    `order` is the pre-sorted positional row order (e.g. returned by a cached filter
+    function), so jumping between pages only slices it and never re-filters. Only
+    the rows of the visible page are sent to the browser. `limit` caps the rows
+    shown (the "Results to show" option) while the caption still reports every match.
+    """
+    #Plain slicing works on a range, list or array, so numpy is not imported before the page title
+    order = range(len(df)) if order is None else order
+    total = len(order)
+    if limit is not None:
+        order = order[:limit]
+
+    n_pages = max(1, math.ceil(len(order) / page_size))
+    page_key = f"{key}_page"
+
+    #Filters may have shrunk the result since the page was chosen
+    if st.session_state.get(page_key, 1) > n_pages:
+        st.session_state[page_key] = 1
+
+    page = 1
+    if n_pages > 1:
+        page = st.number_input("Page", min_value=1, max_value=n_pages, step=1, key=page_key)
+
+    start = (page - 1) * page_size
+    stop = min(start + page_size, len(order))
+
+    if total == 0:
+        st.caption("No matching results")
+    elif n_pages > 1:
+        st.caption(f"{total:,} matching results · showing {start + 1:,}-{stop:,} (page {page} of {n_pages})")
+    else:
+        st.caption(f"{total:,} matching results · showing {stop:,}")
+
+    view = df.iloc[order[start:stop]]
+    if columns is not None:
+        view = view[columns]
+    if rename_columns:
+        view = view.rename(columns=rename_columns)
+    st.dataframe(view)
@@ -0,0 +1,262 @@
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIR = ".pipeline_cache"
+WORK_DIR = os.path.join(CACHE_DIR, "work")
+
+
+#Stage functions run in worker processes: they take input paths and write output paths
+
+def clean_houses(inputs, outputs):
+    from house_data import assign_listing_ids, clean_house_table
+    df = assign_listing_ids(pd.read_csv(inputs[0]))
+    clean_house_table(df).to_pickle(outputs[0])
+
+
+def parse_houses(inputs, outputs):
+    from house_data import encode_facilities, parse_house_numbers
+    df = parse_house_numbers(pd.read_pickle(inputs[0]))
+    df['facility_mask'] = encode_facilities(df)
+    df.to_csv(outputs[0], index=False)
+    #Scoring reads the frame itself: 'None' facilities would come back from the CSV as NaN
+    df.to_pickle(outputs[1])
+
+
+def score_houses(inputs, outputs):
+    import house_data
+    house_data.score_houses(pd.read_pickle(inputs[0])).to_csv(outputs[0], index=False)
+
+
+def clean_jobs(inputs, outputs):
+    from job_data import clean_job_table
+    clean_job_table(pd.read_csv(inputs[0], encoding="utf-8-sig")).to_pickle(outputs[0])
+
+
+def parse_jobs(inputs, outputs):
+    from job_data import parse_job_table
+    df = parse_job_table(pd.read_pickle(inputs[0]))
+    df.to_pickle(outputs[0])
+    #Embedding only depends on the set of titles, so it is cached on this file alone
+    with open(outputs[1], "w", encoding="utf-8") as f:
+        json.dump(sorted(df['title'].astype(str).unique()), f, ensure_ascii=False)
+
+
+def embed_titles(inputs, outputs):
+    from sentence_transformers import SentenceTransformer
+    from job_data import EMBED_MODEL
+
+    with open(inputs[0], encoding="utf-8") as f:
+        titles = json.load(f)
+    #Every distinct title is encoded once instead of once per posting
+    embeddings = SentenceTransformer(EMBED_MODEL).encode(titles, convert_to_numpy=True, show_progress_bar=False)
+    np.save(outputs[0], embeddings)
+
+
+def cluster_titles(inputs, outputs):
+    import hdbscan
+    from sklearn.model_selection import train_test_split
+
+    df = pd.read_pickle(inputs[0])
+    with open(inputs[1], encoding="utf-8") as f:
+        titles = json.load(f)
+    embeddings = np.load(inputs[2])[pd.Index(titles).get_indexer(df['title'].astype(str))]
+
+    #Same 70/30 split as the notebook: fit on the train rows, approximate_predict the rest
+    train_idx, test_idx = train_test_split(np.arange(len(df)), test_size=0.3, random_state=42)
+    clusterer = hdbscan.HDBSCAN(min_cluster_size=10, min_samples=5, metric='euclidean', prediction_data=True)
+    train_clusters = clusterer.fit_predict(embeddings[train_idx])
+    test_clusters, _ = hdbscan.approximate_predict(clusterer, embeddings[test_idx])
+
+    labels = np.empty(len(df), dtype=object)
+    labels[train_idx] = train_clusters.astype(str)
+    labels[test_idx] = test_clusters.astype(str)
+    np.save(outputs[0], labels.astype(str))
+
+
+def score_jobs(inputs, outputs):
+    import job_data
+    df = pd.read_pickle(inputs[0])
+    job_data.score_jobs(df, np.load(inputs[1]).astype(object)).to_csv(outputs[0], index=False)
+
+
+def aggregate_districts(inputs, outputs):
+    from district_store import DistrictScoreStore
+    from quantile_sketch import build_sketches, save_sketches
+
+    job_df, house_df, house_raw = (pd.read_csv(path) for path in inputs)
+    if os.path.exists(outputs[1]) and os.path.exists(outputs[2]):
+        #Only the score rows added, removed or rescored since the last run are applied
+        store = DistrictScoreStore.load(outputs[1], outputs[2])
+        store.sync(job_df, house_df)
+    else:
+        store = DistrictScoreStore.from_scores(job_df, house_df)
+    store.write_scores(outputs[0])
+    store.save(outputs[1], outputs[2])
+    save_sketches(build_sketches(job_df, house_raw), outputs[3])
+
+
+class Stage:
+    """
+    One step of the pipeline. `code` lists the modules whose source, together
+    with the function itself, is part of the cache key, so editing the scoring
+    rules reruns the stages that use them.
+    """
+
+    def __init__(self, name, func, inputs, outputs, code=()):
+        self.name = name
+        self.func = func
+        self.inputs = inputs
+        self.outputs = outputs
+        self.code = code
+
+
+def build_stages():
+    work = lambda name: os.path.join(WORK_DIR, name)
+    return [
+        Stage("house_clean", clean_houses, ["House_Rental.csv"], [work("houses_clean.pkl")], ["house_data.py"]),
+        Stage("house_parse", parse_houses, [work("houses_clean.pkl")],
+              ["house_data_cleaned.csv", work("houses_parsed.pkl")], ["house_data.py"]),
+        Stage("house_score", score_houses, [work("houses_parsed.pkl")], ["house_scores.csv"], ["house_data.py"]),
+        Stage("job_clean", clean_jobs, ["jobs_myfuturejobs.csv"], [work("jobs_clean.pkl")], ["job_data.py", "dedup.py"]),
+        Stage("job_parse", parse_jobs, [work("jobs_clean.pkl")],
+              [work("jobs_parsed.pkl"), work("job_titles.json")], ["job_data.py"]),
+        Stage("job_embed", embed_titles, [work("job_titles.json")], [work("job_title_embeddings.npy")], ["job_data.py"]),
+        Stage("job_cluster", cluster_titles,
+              [work("jobs_parsed.pkl"), work("job_titles.json"), work("job_title_embeddings.npy")],
+              [work("job_title_clusters.npy")]),
+        Stage("job_score", score_jobs, [work("jobs_parsed.pkl"), work("job_title_clusters.npy")],
+              ["job_scores.csv"], ["job_data.py"]),
+        Stage("aggregate", aggregate_districts, ["job_scores.csv", "house_scores.csv", "house_data_cleaned.csv"],
+              ["district_scores.csv", "district_aggregates.csv", "district_members.csv", "quantile_sketches.json"],
+              ["district_store.py", "quantile_sketch.py"]),
+    ]
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def stage_key(stage):
+    """Content hash of the stage's code and input files"""
+    digest = hashlib.sha256(stage.name.encode())
+    digest.update(inspect.getsource(stage.func).encode())
+    module_dir = os.path.dirname(os.path.abspath(__file__))
+    for module in stage.code:
+        digest.update(file_hash(os.path.join(module_dir, module)).encode())
+    for path in stage.inputs:
+        digest.update(file_hash(path).encode())
+    return digest.hexdigest()[:20]
+
+
+def _cache_entry(stage, key):
+    return os.path.join(CACHE_DIR, stage.name, key)
+
+
+def restore_cached(stage, key):
+    """Copy a cached result of `stage` into place; False when there is none"""
+    entry = _cache_entry(stage, key)
+    cached = [os.path.join(entry, os.path.basename(path)) for path in stage.outputs]
+    if not all(os.path.exists(path) for path in cached):
+        return False
+    for source, target in zip(cached, stage.outputs):
+        if not os.path.exists(target) or file_hash(target) != file_hash(source):
+            shutil.copyfile(source, target)
+    return True
+
+
+def _store_cached(stage, key):
+    entry = _cache_entry(stage, key)
+    os.makedirs(entry, exist_ok=True)
+    for path in stage.outputs:
+        shutil.copyfile(path, os.path.join(entry, os.path.basename(path)))
+
+
+def _run_stage(func, inputs, outputs):
+    start = time.perf_counter()
+    func(inputs, outputs)
+    return time.perf_counter() - start
+
+
+def run_pipeline(stages=None, workers=2, force=False):
+    """
+    Run the stages as a DAG in the current directory. A stage starts as soon as
+    the stages producing its inputs are done, so the house and job branches run
+    side by side in worker processes. A stage whose code and inputs hash to a
+    cached result is restored instead of run. With `force` every stage runs and
+    its old outputs are deleted first, so the district store is rebuilt rather
+    than updated. Returns
+    [(stage, "ran" | "cached", seconds)] in completion order.
+    """
+    stages = stages or build_stages()
+    producers = {path: stage.name for stage in stages for path in stage.outputs}
+    deps = {stage.name: {producers[path] for path in stage.inputs if path in producers} for stage in stages}
+    os.makedirs(WORK_DIR, exist_ok=True)
+
+    done, started, running, timings = set(), set(), {}, []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while len(done) < len(stages):
+            for stage in stages:
+                if stage.name in done or stage.name in started or not deps[stage.name] <= done:
+                    continue
+                key = stage_key(stage)
+                if not force and restore_cached(stage, key):
+                    done.add(stage.name)
+                    timings.append((stage.name, "cached", 0.0))
+                    print(f"{stage.name:<12} cached", flush=True)
+                    continue
+                if force:
+                    for path in stage.outputs:
+                        if os.path.exists(path):
+                            os.remove(path)
+                running[pool.submit(_run_stage, stage.func, stage.inputs, stage.outputs)] = (stage, key)
+                started.add(stage.name)
+
+            if not running:
+                #Restoring from the cache may have made further stages ready
+                continue
+
+            finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage, key = running.pop(future)
+                seconds = future.result()
+                _store_cached(stage, key)
+                done.add(stage.name)
+                timings.append((stage.name, "ran", seconds))
+                print(f"{stage.name:<12} ran in {seconds:.2f}s", flush=True)
+
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Clean, parse, embed, cluster, score and aggregate the scraped data "
+                    "into the CSVs read by the app"
+    )
+    parser.add_argument("--data-dir", default=".", help="directory with the scraped CSVs and outputs")
+    parser.add_argument("--workers", type=int, default=2, help="worker processes (the two branches need 2)")
+    parser.add_argument("--force", action="store_true", help="ignore cached stage results")
+    args = parser.parse_args()
+
+    os.chdir(args.data_dir)
+
+    start = time.perf_counter()
+    timings = run_pipeline(workers=args.workers, force=args.force)
+    wall = time.perf_counter() - start
+
+    print(f"\n{'stage':<12} {'status':<7} {'seconds':>8}")
+    for name, status, seconds in timings:
+        print(f"{name:<12} {status:<7} {seconds:>8.2f}")
+    print(f"{'total':<12} {'':<7} {wall:>8.2f}  (stage time {sum(t for _, _, t in timings):.2f}s)")
@@ -0,0 +1,244 @@
+import bisect
+import itertools
+import json
+import math
+import os
+import random
+
+import pandas as pd
+
+SKETCHES_PATH = "quantile_sketches.json"
+DEFAULT_K = 200
+
+#Named statistics accepted by the ranking functions and the dashboard
+QUANTILES = {"p25": 0.25, "median": 0.5, "p75": 0.75, "p90": 0.9}
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch (Karnin, Lang & Liberty).
+
+    Values are kept in a stack of compactors; compactor h holds items of weight
+    2**h and has a capacity that shrinks geometrically towards the lower levels,
+    so the sketch stores O(k) items whatever the stream length. A full compactor
+    sorts itself and promotes every other item (random offset) to the next level.
+    Sketches of the same k merge by concatenating levels and compacting, which is
+    what makes state and national rollups possible without the raw rows. Rank
+    error is roughly 1.7/k of the stream length. Deletions are not supported.
+    """
+
+    def __init__(self, k=DEFAULT_K, seed=0):
+        self.k = k
+        self.n = 0
+        self.compactors = [[]]
+        self._rng = random.Random(seed)
+        self._max_size = self._capacity(0)
+
+    def __len__(self):
+        return self.n
+
+    def _capacity(self, h):
+        depth = len(self.compactors) - h - 1
+        return int(math.ceil(self.k * (2 / 3) ** depth)) + 1
+
+    def _size(self):
+        return sum(len(c) for c in self.compactors)
+
+    def _grow(self):
+        self.compactors.append([])
+        self._max_size = sum(self._capacity(h) for h in range(len(self.compactors)))
+
+    def _compress(self):
+        while self._size() >= self._max_size:
+            for h in range(len(self.compactors)):
+                if len(self.compactors[h]) >= self._capacity(h):
+                    if h + 1 >= len(self.compactors):
+                        self._grow()
+                    items = sorted(self.compactors[h])
+                    #An odd item out stays behind so total weight is preserved
+                    leftover = items[:len(items) % 2]
+                    items = items[len(items) % 2:]
+                    offset = self._rng.randint(0, 1)
+                    self.compactors[h + 1].extend(items[offset::2])
+                    self.compactors[h] = leftover
+                    break
+
+    def update(self, value):
+        if value is None or math.isnan(value):
+            return
+        self.compactors[0].append(float(value))
+        self.n += 1
+        if len(self.compactors[0]) >= self._capacity(0):
+            self._compress()
+
+    def update_many(self, values):
+        for value in values:
+            self.update(value)
+
+    def merge(self, other):
+        """Fold `other` into this sketch (in place) and return self"""
+        if other.k != self.k:
+            raise ValueError("Only sketches with the same k can be merged")
+        while len(self.compactors) < len(other.compactors):
+            self._grow()
+        for h, items in enumerate(other.compactors):
+            self.compactors[h].extend(items)
+        self.n += other.n
+        self._compress()
+        return self
+
+    def copy(self):
+        clone = KLLSketch(self.k)
+        clone.n = self.n
+        clone.compactors = [list(c) for c in self.compactors]
+        clone._rng.setstate(self._rng.getstate())
+        clone._max_size = self._max_size
+        return clone
+
+    def quantile(self, q):
+        """
+        Return the q-quantile, interpolating linearly between the neighbouring
+        ranks like pandas' default, so an uncompacted sketch gives the exact value.
+        """
+        if self.n == 0:
+            return float("nan")
+        weighted = sorted(
+            (value, 1 << h)
+            for h, items in enumerate(self.compactors)
+            for value in items
+        )
+        #An item of weight w stands for w copies of its value at consecutive ranks
+        ends = list(itertools.accumulate(w for _, w in weighted))
+        rank = q * (ends[-1] - 1)
+        below = math.floor(rank)
+        lower = weighted[bisect.bisect_right(ends, below)][0]
+        upper = weighted[bisect.bisect_right(ends, math.ceil(rank))][0]
+        return lower + (upper - lower) * (rank - below)
+
+    def to_dict(self):
+        return {"k": self.k, "n": self.n, "compactors": self.compactors}
+
+    @classmethod
+    def from_dict(cls, data, seed=0):
+        sketch = cls(data["k"], seed=seed)
+        sketch.compactors = [list(c) for c in data["compactors"]]
+        sketch.n = data["n"]
+        sketch._max_size = sum(sketch._capacity(h) for h in range(len(sketch.compactors)))
+        return sketch
+
+
+class GroupedSketches:
+    """
+    One KLLSketch per (state, district) for a single metric.
+
+    State and national figures are produced by merging the district sketches, so
+    only district sketches are maintained at ingest.
+    """
+
+    def __init__(self, k=DEFAULT_K):
+        self.k = k
+        self.groups = {}
+
+    def add(self, state, district, value):
+        if pd.isna(state) or pd.isna(district) or pd.isna(value):
+            return
+        key = (state, district)
+        if key not in self.groups:
+            self.groups[key] = KLLSketch(self.k)
+        self.groups[key].update(value)
+
+    def add_frame(self, df, state_col, district_col, value_col):
+        values = pd.to_numeric(df[value_col], errors="coerce")
+        for state, district, value in zip(df[state_col], df[district_col], values):
+            self.add(state, district, value)
+
+    def rollup(self, states=None):
+        """Merge the district sketches of `states` (all states when None)"""
+        merged = KLLSketch(self.k)
+        for (state, _), sketch in sorted(self.groups.items()):
+            if states is None or state in states:
+                merged.merge(sketch)
+        return merged
+
+    def state_sketches(self):
+        return {state: self.rollup([state]) for state in sorted({s for s, _ in self.groups})}
+
+    def quantile_frame(self, q, value_col, by="district"):
+        """Return one row per district (or state) with the q-quantile and the count"""
+        if by == "state":
+            rows = [(state, sketch.quantile(q), sketch.n) for state, sketch in self.state_sketches().items()]
+            return pd.DataFrame(rows, columns=["state", value_col, "count"])
+
+        rows = [
+            (state, district, sketch.quantile(q), sketch.n)
+            for (state, district), sketch in sorted(self.groups.items())
+        ]
+        return pd.DataFrame(rows, columns=["state", "district", value_col, "count"])
+
+    def to_dict(self):
+        return {
+            "k": self.k,
+            "groups": [
+                {"state": state, "district": district, "sketch": sketch.to_dict()}
+                for (state, district), sketch in sorted(self.groups.items())
+            ]
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        grouped = cls(data["k"])
+        for group in data["groups"]:
+            grouped.groups[(group["state"], group["district"])] = KLLSketch.from_dict(group["sketch"])
+        return grouped
+
+
+def update_sketches(sketches, job_df=None, house_df=None):
+    """Add job rows (salary) and cleaned house rows (rent/size) to `sketches` in place"""
+    if job_df is not None:
+        sketches["salary"].add_frame(job_df, "state", "district", "salary")
+    if house_df is not None:
+        sketches["rent"].add_frame(house_df, "State", "District", "Price")
+        sketches["size"].add_frame(house_df, "State", "District", "Size")
+    return sketches
+
+
+def build_sketches(job_df, house_df, k=DEFAULT_K):
+    """Sketch salary (jobs) and rent/size (raw cleaned houses) per district"""
+    sketches = {"salary": GroupedSketches(k), "rent": GroupedSketches(k), "size": GroupedSketches(k)}
+    return update_sketches(sketches, job_df, house_df)
+
+
+def ingest_sketches(job_df=None, house_df=None, path=SKETCHES_PATH):
+    """
+    Add the new rows of a scrape run to the saved sketches, so medians and
+    percentiles include them without waiting for the next pipeline rebuild.
+
+    Sketches cannot forget values: a listing scraped again keeps its old value
+    until the pipeline rebuilds them. Returns False when they were never built.
+    """
+    sketches = load_sketches(path)
+    if sketches is None:
+        return False
+    save_sketches(update_sketches(sketches, job_df, house_df), path)
+    return True
+
+
+def save_sketches(sketches, path=SKETCHES_PATH):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({name: grouped.to_dict() for name, grouped in sketches.items()}, f)
+
+
+def load_sketches(path=SKETCHES_PATH):
+    """Return the saved sketches, or None when they have not been built yet"""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return {name: GroupedSketches.from_dict(grouped) for name, grouped in data.items()}
+
+
+if __name__ == "__main__":
+    sketches = build_sketches(pd.read_csv("job_scores.csv"), pd.read_csv("house_data_cleaned.csv"))
+    save_sketches(sketches)
+    print(f"Saved sketches for {len(sketches['salary'].groups)} job districts and "
+          f"{len(sketches['rent'].groups)} house districts to '{SKETCHES_PATH}'")
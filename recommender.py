@@ -1,4 +1,19 @@
+import numpy as np
 import pandas as pd
+from house_data import attach_raw_columns
+from quantile_sketch import QUANTILES
+from skyline import skyline_layers
+
+#Objectives of the district skyline: column -> "max" or "min"
+DISTRICT_OBJECTIVES = {
+    "job_score_norm": "max",
+    "house_score_norm": "max",
+    "median_salary": "max",
+    "median_price": "min",
+    "job_count": "max",
+    "house_count": "max"
+}
+PAIR_OBJECTIVES = {"job_score": "max", "salary": "max", "house_score": "max", "Price": "min"}
 
 def rename_columns_for_display(df):
     """Rename columns for display in dataframes"""
@@ -10,10 +25,31 @@ def rename_columns_for_display(df):
         'avg_price': 'Average Price',
         'total_score': 'Total Score',
         'house_score': 'House Score',
-        'job_score': 'Job Score'
+        'job_score': 'Job Score',
+        'job_score_norm': 'Job Score (norm)',
+        'house_score_norm': 'House Score (norm)',
+        'job_count': 'Jobs',
+        'house_count': 'Houses',
+        'skyline_layer': 'Skyline Layer'
     }
+    for stat in QUANTILES:
+        label = "Median" if stat == "median" else stat.upper()
+        rename_map[f"{stat}_salary"] = f"{label} Salary"
+        rename_map[f"{stat}_price"] = f"{label} Price"
     return df.rename(columns=rename_map)
 
+
+def _quantile_by_district(df, group_cols, value_col, stat, out_col, grouped_sketches=None):
+    """
+    Per-district quantile of `value_col`, read from the district sketches when given
+    (no sorting of raw rows) and computed from `df` otherwise.
+    """
+    q = QUANTILES[stat]
+    if grouped_sketches is not None:
+        result = grouped_sketches.quantile_frame(q, out_col).drop(columns="count")
+        return result.rename(columns={"state": group_cols[0], "district": group_cols[1]})
+    return df.groupby(group_cols)[value_col].quantile(q).reset_index(name=out_col)
+
 def recommend_districts(district_df, job_weight=0.6, house_weight=0.4, top_k=5):
     df = district_df.copy()
 
@@ -31,32 +67,84 @@ def recommend_districts(district_df, job_weight=0.6, house_weight=0.4, top_k=5):
     return rename_columns_for_display(result.head(top_k))
 
 
-def highest_lowest_salary_districts(job_df, mode="highest", top_k=5):
-    avg_salary = (
-        job_df.groupby(["state", "district"], as_index=False)
-        .agg(avg_salary=("salary", "mean"))
+def district_skyline_layers(district_df, job_df, house_raw_df, sketches=None, objectives=DISTRICT_OBJECTIVES):
+    """
+    Attach median salary and rent to the district scores and rank every district
+    by skyline layer. Layer 1 holds the districts that no other district beats on
+    all objectives at once; layer 2 is the front once layer 1 is removed, and so on.
+
+    Unlike recommend_districts this needs no weights, so it is computed once and
+    the layers are only filtered when the user explores them.
+    """
+    median_salary = _quantile_by_district(
+        job_df, ["state", "district"], "salary", "median", "median_salary",
+        sketches["salary"] if sketches else None
     )
+    prices = house_raw_df.assign(Price=_to_numeric_price(house_raw_df["Price"]))
+    median_price = _quantile_by_district(
+        prices, ["State", "District"], "Price", "median", "median_price",
+        sketches["rent"] if sketches else None
+    ).rename(columns={"State": "state", "District": "district"})
+
+    df = (
+        district_df.drop(columns=["Unnamed: 0"], errors="ignore")
+        .merge(median_salary, on=["state", "district"], how="left")
+        .merge(median_price, on=["state", "district"], how="left")
+    )
+    df["median_salary"] = df["median_salary"].round(2)
+    df["median_price"] = df["median_price"].round(2)
+    df["skyline_layer"] = skyline_layers(df, objectives)
+
+    #Within a layer no district dominates another; show the best balanced ones first
+    df["_balance"] = df["job_score_norm"] + df["house_score_norm"]
+    df = df.dropna(subset=["skyline_layer"]).sort_values(["skyline_layer", "_balance"], ascending=[True, False])
+
+    columns = ["skyline_layer", "state", "district"] + list(objectives)
+    return df[columns].reset_index(drop=True)
+
+
+def highest_lowest_salary_districts(job_df, mode="highest", top_k=5, stat="mean", sketches=None):
+    """
+    Rank districts by salary. `stat` is "mean" or one of QUANTILES ("median",
+    "p90", ...); quantiles come from the per-district `sketches` when provided.
+    """
+    if stat == "mean":
+        salary_col = "avg_salary"
+        avg_salary = (
+            job_df.groupby(["state", "district"], as_index=False)
+            .agg(avg_salary=("salary", "mean"))
+        )
+    else:
+        salary_col = f"{stat}_salary"
+        avg_salary = _quantile_by_district(
+            job_df, ["state", "district"], "salary", stat, salary_col,
+            sketches["salary"] if sketches else None
+        )
 
     #Round salaries to 2 decimal places for display
-    if "avg_salary" in avg_salary.columns:
-        avg_salary["avg_salary"] = avg_salary["avg_salary"].round(2)
+    if salary_col in avg_salary.columns:
+        avg_salary[salary_col] = avg_salary[salary_col].round(2)
 
     #Exclude zero or non-positive averages (but fallback to original if nothing remains)
-    cleaned = avg_salary.dropna(subset=["avg_salary"]) if "avg_salary" in avg_salary.columns else avg_salary
-    cleaned_pos = cleaned[cleaned["avg_salary"] > 0]
+    cleaned = avg_salary.dropna(subset=[salary_col]) if salary_col in avg_salary.columns else avg_salary
+    cleaned_pos = cleaned[cleaned[salary_col] > 0]
 
     use_df = cleaned_pos if not cleaned_pos.empty else avg_salary
 
     ascending = True if mode == "lowest" else False
-    return rename_columns_for_display(use_df.sort_values("avg_salary", ascending=ascending).head(top_k))
+    return rename_columns_for_display(use_df.sort_values(salary_col, ascending=ascending).head(top_k))
 
 
-def highest_lowest_house_price(house_df, house_type=None, mode="lowest", top_k=5, house_raw_df=None):
+def highest_lowest_house_price(house_df, house_type=None, mode="lowest", top_k=5, house_raw_df=None,
+                               stat="mean", sketches=None):
     """
     Compute average house rental prices by State and District.
 
     If `house_raw_df` is provided it will be used for price calculations (preferred),
     otherwise `house_df` is used. Returns averages rounded to 2 decimals.
+
+    `stat` may also be one of QUANTILES; the per-district rent `sketches` are used
+    for it when no house type filter applies (they are not kept per type).
     """
     #Prefer raw house data for accurate price values
     source_df = None
@@ -86,24 +174,251 @@ def highest_lowest_house_price(house_df, house_type=None, mode="lowest", top_k=5
         df = house_df.copy()
         if house_type and "Type" in df.columns:
             df = df[df["Type"] == house_type]
+        state_col, district_col, source_df = "State", "District", df
+
+    if stat == "mean":
+        price_col = "avg_price"
         avg_price = (
-            df.groupby(["State", "District"], as_index=False)
+            source_df.groupby([state_col, district_col], as_index=False)
             .agg(avg_price=("Price", "mean"))
         )
     else:
-        avg_price = (
-            source_df.groupby([state_col, district_col], as_index=False)
-            .agg(avg_price=("Price", "mean"))
+        price_col = f"{stat}_price"
+        avg_price = _quantile_by_district(
+            source_df, [state_col, district_col], "Price", stat, price_col,
+            sketches["rent"] if sketches and not house_type else None
         )
 
     #Round to 2 decimals and exclude zero/non-positive averages when possible
-    if "avg_price" in avg_price.columns:
-        avg_price["avg_price"] = avg_price["avg_price"].round(2)
+    if price_col in avg_price.columns:
+        avg_price[price_col] = avg_price[price_col].round(2)
 
-    cleaned_p = avg_price.dropna(subset=["avg_price"]) if "avg_price" in avg_price.columns else avg_price
-    cleaned_pos_p = cleaned_p[cleaned_p["avg_price"] > 0]
+    cleaned_p = avg_price.dropna(subset=[price_col]) if price_col in avg_price.columns else avg_price
+    cleaned_pos_p = cleaned_p[cleaned_p[price_col] > 0]
 
     use_price_df = cleaned_pos_p if not cleaned_pos_p.empty else avg_price
 
     ascending = True if mode == "lowest" else False
-    return rename_columns_for_display(use_price_df.sort_values("avg_price", ascending=ascending).head(top_k))
+    return rename_columns_for_display(use_price_df.sort_values(price_col, ascending=ascending).head(top_k))
+
+
+
+def _to_numeric_price(series):
+    """Strip thousands separators/quotes and convert a price column to numbers"""
+    return pd.to_numeric(
+        series.astype(str)
+        .str.replace(",", "", regex=False)
+        .str.replace('"', "", regex=False)
+        .str.strip(),
+        errors="coerce"
+    )
+
+
+def _with_raw_prices(house_df, house_raw_df):
+    """
+    Return the scored houses with their raw rents. house_scores.csv only carries
+    min-max scaled prices (0 to 1), which would make every house look affordable.
+    """
+    if house_raw_df is None or "Price" not in house_raw_df.columns:
+        raise ValueError("house_raw_df with raw Price values is required to check affordability")
+    houses = attach_raw_columns(house_df.reset_index(drop=True), house_raw_df, ["Price"])
+    houses["Price"] = _to_numeric_price(houses["Price"])
+    return houses
+
+
+def _min_max(values):
+    lo, hi = np.nanmin(values), np.nanmax(values)
+    if hi > lo:
+        return (values - lo) / (hi - lo)
+    return np.zeros_like(values)
+
+
+def _affordable_top_k(prices, house_scores, budgets, top_k, block_size):
+    """
+    For salaries sorted ascending, return (job_pos, house_pos, house_score) of the
+    top_k affordable houses for every job.
+
+    `prices` must be sorted ascending, so the houses a job can afford are always a
+    prefix of the price array. Jobs are handled in blocks and each block is only
+    broadcast against the prefix affordable to its richest job, so at most
+    block_size x len(prices) scores are held at once.
+    """
+    n_afford = np.searchsorted(prices, budgets, side="right")
+    job_pos, house_pos, scores_out = [], [], []
+
+    for start in range(0, len(budgets), block_size):
+        stop = min(start + block_size, len(budgets))
+        limit = n_afford[stop - 1]
+        if limit == 0:
+            continue
+
+        block_afford = n_afford[start:stop]
+        mask = np.arange(limit)[None, :] < block_afford[:, None]
+        scores = np.where(mask, house_scores[None, :limit], -np.inf)
+
+        k = min(top_k, limit)
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+
+        valid = np.isfinite(top_scores)
+        rows = np.broadcast_to(np.arange(start, stop)[:, None], top.shape)
+        job_pos.append(rows[valid])
+        house_pos.append(top[valid])
+        scores_out.append(top_scores[valid])
+
+    if not job_pos:
+        empty = np.array([], dtype=int)
+        return empty, empty, np.array([], dtype=float)
+    return np.concatenate(job_pos), np.concatenate(house_pos), np.concatenate(scores_out)
+
+
+def affordable_job_house_pairs(job_df, house_df, rent_share=0.3, mode="job", top_k=5,
+                               job_weight=0.5, house_weight=0.5, districts=None,
+                               house_raw_df=None, block_size=256):
+    """
+    Pair jobs with houses in the same State/District where the rent is at most
+    `rent_share` of the job salary.
+
+    mode="job" returns the top_k affordable houses for every job, mode="district"
+    returns the top_k job-house pairs of each district. Pairs are ranked by
+    `pair_score`, a weighted sum of the min-max normalised job and house scores.
+
+    `districts` optionally restricts the work to a list of (state, district) tuples.
+    Rents come from the Price column of `house_raw_df` (house_df carries scaled
+    prices), looked up 1:1 by listing_id; a ValueError is raised without it.
+    """
+    if mode not in ("job", "district"):
+        raise ValueError("mode must be 'job' or 'district'")
+
+    jobs = job_df.reset_index(drop=True)
+    houses = _with_raw_prices(house_df, house_raw_df)
+
+    salaries = pd.to_numeric(jobs["salary"], errors="coerce").to_numpy(dtype=float)
+    prices = houses["Price"].to_numpy(dtype=float)
+    job_norm = _min_max(jobs["job_score"].to_numpy(dtype=float))
+    house_norm = _min_max(houses["house_score"].to_numpy(dtype=float))
+
+    job_valid = ~np.isnan(salaries) & (salaries > 0) & ~np.isnan(job_norm)
+    house_valid = ~np.isnan(prices) & (prices > 0) & ~np.isnan(house_norm)
+
+    job_groups = jobs[job_valid].groupby(["state", "district"]).indices
+    house_groups = houses[house_valid].groupby(["State", "District"]).indices
+    job_rows = np.flatnonzero(job_valid)
+    house_rows = np.flatnonzero(house_valid)
+
+    keys = job_groups.keys() & house_groups.keys()
+    if districts is not None:
+        keys = keys & {tuple(d) for d in districts}
+
+    pair_jobs, pair_houses, pair_scores = [], [], []
+    for key in sorted(keys):
+        j_idx = job_rows[job_groups[key]]
+        h_idx = house_rows[house_groups[key]]
+
+        j_idx = j_idx[np.argsort(salaries[j_idx], kind="stable")]
+        h_idx = h_idx[np.argsort(prices[h_idx], kind="stable")]
+
+        job_pos, house_pos, h_scores = _affordable_top_k(
+            prices[h_idx],
+            house_norm[h_idx],
+            rent_share * salaries[j_idx],
+            top_k,
+            block_size
+        )
+        scores = job_weight * job_norm[j_idx[job_pos]] + house_weight * h_scores
+
+        if mode == "district" and len(scores) > top_k:
+            #Each job's best pairs are already in its top_k, so the district top_k is among them
+            best = np.argpartition(-scores, top_k - 1)[:top_k]
+            job_pos, house_pos, scores = job_pos[best], house_pos[best], scores[best]
+
+        pair_jobs.append(j_idx[job_pos])
+        pair_houses.append(h_idx[house_pos])
+        pair_scores.append(scores)
+
+    job_cols = [c for c in ["state", "district", "title", "salary", "contract_type_name", "job_score"] if c in jobs.columns]
+    house_cols = [c for c in ["Name", "Price", "Type", "house_score"] if c in houses.columns]
+
+    if not pair_scores:
+        return pd.DataFrame(columns=job_cols + house_cols + ["rent_ratio", "pair_score"])
+
+    pair_jobs = np.concatenate(pair_jobs)
+    pair_houses = np.concatenate(pair_houses)
+
+    result = pd.concat(
+        [
+            jobs.iloc[pair_jobs][job_cols].reset_index(drop=True),
+            houses.iloc[pair_houses][house_cols].reset_index(drop=True)
+        ],
+        axis=1
+    )
+    result["rent_ratio"] = (prices[pair_houses] / salaries[pair_jobs]).round(3)
+    result["pair_score"] = np.concatenate(pair_scores).round(4)
+
+    if mode == "district":
+        result = result.sort_values(["state", "district", "pair_score"], ascending=[True, True, False])
+    else:
+        result["_job"] = pair_jobs
+        result = result.sort_values(["_job", "pair_score"], ascending=[True, False]).drop(columns="_job")
+
+    return result.reset_index(drop=True)
+
+
+def skyline_job_house_pairs(job_df, house_df, rent_share=0.3, districts=None, house_raw_df=None,
+                            max_layers=1, objectives=PAIR_OBJECTIVES):
+    """
+    Return the first `max_layers` skyline layers of the affordable job-house pairs
+    of each district (rent at most `rent_share` of the salary).
+
+    Pairs are never enumerated per district. A job beaten on its own objectives
+    by another job can swap in that job, which pays at least as much and so can
+    still afford the house. A beaten house can swap in its cheaper dominator in
+    the same way. A pair in layer k therefore joins a job and a house that are
+    both in layer k or better of their own side's skyline. Only those short lists
+    are crossed, then ranked on all objectives. Rents come from `house_raw_df`,
+    as in affordable_job_house_pairs.
+    """
+    jobs = job_df.reset_index(drop=True)
+    houses = _with_raw_prices(house_df, house_raw_df)
+    jobs["salary"] = pd.to_numeric(jobs["salary"], errors="coerce")
+
+    jobs = jobs[(jobs["salary"] > 0) & jobs["job_score"].notna()]
+    houses = houses[(houses["Price"] > 0) & houses["house_score"].notna()]
+
+    job_objectives = {c: objectives[c] for c in objectives if c in jobs.columns}
+    house_objectives = {c: objectives[c] for c in objectives if c in houses.columns and c not in job_objectives}
+
+    job_groups = jobs.groupby(["state", "district"]).indices
+    house_groups = houses.groupby(["State", "District"]).indices
+    keys = job_groups.keys() & house_groups.keys()
+    if districts is not None:
+        keys = keys & {tuple(d) for d in districts}
+
+    job_cols = [c for c in ["state", "district", "title", "salary", "contract_type_name", "job_score"] if c in jobs.columns]
+    house_cols = [c for c in ["Name", "Price", "Type", "house_score"] if c in houses.columns]
+
+    frames = []
+    for key in sorted(keys):
+        district_jobs = jobs.iloc[job_groups[key]]
+        district_houses = houses.iloc[house_groups[key]]
+        district_jobs = district_jobs[skyline_layers(district_jobs, job_objectives, max_layers).notna().to_numpy()]
+        district_houses = district_houses[skyline_layers(district_houses, house_objectives, max_layers).notna().to_numpy()]
+
+        pairs = district_jobs[job_cols].merge(district_houses[house_cols], how="cross")
+        pairs = pairs[pairs["Price"] <= rent_share * pairs["salary"]]
+        if pairs.empty:
+            continue
+
+        pairs["skyline_layer"] = skyline_layers(pairs, objectives, max_layers)
+        frames.append(pairs.dropna(subset=["skyline_layer"]))
+
+    if not frames:
+        return pd.DataFrame(columns=job_cols + house_cols + ["rent_ratio", "skyline_layer"])
+
+    result = pd.concat(frames, ignore_index=True)
+    result["rent_ratio"] = (result["Price"] / result["salary"]).round(3)
+    result = result.sort_values(
+        ["state", "district", "skyline_layer", "job_score", "house_score"],
+        ascending=[True, True, True, False, False]
+    )
+    return result.reset_index(drop=True)
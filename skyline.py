@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+
+def _dense_ranks(values):
+    return np.unique(values, return_inverse=True)[1].reshape(-1)
+
+
+def _dominated_by(block, point):
+    """True when any row of `block` dominates `point` (all objectives maximised)"""
+    return bool(np.any(np.all(block >= point, axis=1) & np.any(block > point, axis=1)))
+
+
+def pareto_layers(points, max_layers=None):
+    """
+    Return the non-dominated sorting layer (1 = Pareto front) of every row of an
+    n x d array whose objectives are all to be maximised.
+
+    This is efficient non-dominated sorting with binary search (ENS-BS). Points
+    are presorted by the sum of their per-objective dense ranks. That sum is
+    strictly larger for a dominating point, so every point is visited after all
+    of its dominators. Each point then needs a binary search over the layers
+    found so far: if some point of layer k dominates it, some point of every
+    earlier layer does too. Points beyond `max_layers` get layer 0.
+    """
+    points = np.asarray(points, dtype=float)
+    n, d = points.shape
+    layers_out = np.zeros(n, dtype=int)
+    if n == 0:
+        return layers_out
+
+    rank_sum = sum(_dense_ranks(points[:, i]) for i in range(d))
+    order = np.lexsort([-points[:, i] for i in reversed(range(d))] + [-rank_sum])
+
+    #Each layer is a growable buffer of its points: [array, used rows]
+    layers = []
+    for row in order:
+        point = points[row]
+        lo, hi = 0, len(layers)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            block, used = layers[mid]
+            if _dominated_by(block[:used], point):
+                lo = mid + 1
+            else:
+                hi = mid
+
+        if lo == len(layers):
+            if max_layers is not None and lo >= max_layers:
+                continue
+            layers.append([np.empty((16, d)), 0])
+
+        block, used = layers[lo]
+        if used == len(block):
+            block = np.concatenate([block, np.empty_like(block)])
+            layers[lo][0] = block
+        block[used] = point
+        layers[lo][1] = used + 1
+        layers_out[row] = lo + 1
+
+    return layers_out
+
+
+def skyline_layers(df, objectives, max_layers=None):
+    """
+    Return the skyline layer of every row of `df` as an Int64 Series.
+
+    `objectives` maps column names to "max" or "min". Rows with a missing
+    objective are not ranked (<NA>), nor are rows beyond `max_layers`.
+    """
+    for col, sense in objectives.items():
+        if sense not in ("max", "min"):
+            raise ValueError(f"Objective '{col}' must be 'max' or 'min'")
+
+    values = pd.DataFrame(
+        {col: pd.to_numeric(df[col], errors="coerce") * (1 if sense == "max" else -1)
+         for col, sense in objectives.items()},
+        index=df.index
+    )
+    complete = values.notna().all(axis=1).to_numpy()
+
+    layers = pd.Series(pd.NA, index=df.index, dtype="Int64")
+    found = pareto_layers(values.to_numpy(dtype=float)[complete], max_layers)
+    layers[complete] = np.where(found > 0, found, np.nan)
+    return layers
+
+
+def skyline(df, objectives):
+    """Return the Pareto-optimal rows of `df`"""
+    return df[skyline_layers(df, objectives, max_layers=1) == 1]
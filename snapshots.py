@@ -0,0 +1,158 @@
+import json
+import os
+import re
+import uuid
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+from house_data import clean_numeric, fill_geo_columns
+from job_data import add_location_columns
+from quantile_sketch import KLLSketch, QUANTILES
+
+SNAPSHOT_ROOT = "snapshots"
+
+#How each dataset is grouped and which numeric columns get per-snapshot aggregates
+DATASETS = {
+    "jobs": {"state": "state", "district": "district", "metrics": ["salary"]},
+    "houses": {"state": "State", "district": "District", "metrics": ["Price", "Size"]},
+}
+
+_PARTITION = re.compile(r"^scrape_date=(\d{4}-\d{2}-\d{2})$")
+
+
+def _partition_dir(dataset, scrape_date, root):
+    return os.path.join(root, dataset, f"scrape_date={scrape_date.isoformat()}")
+
+
+def write_snapshot(df, dataset, scrape_date=None, root=SNAPSHOT_ROOT):
+    """
+    Write one scrape run as an immutable Parquet file under
+    <root>/<dataset>/scrape_date=YYYY-MM-DD/ together with its district
+    pre-aggregates under <root>/<dataset>_agg/. Files are never overwritten;
+    several runs on the same day become separate files in the same partition.
+    """
+    if dataset not in DATASETS:
+        raise ValueError(f"Unknown dataset '{dataset}'")
+
+    scrape_date = scrape_date or date.today()
+    run_id = f"run-{datetime.now():%H%M%S}-{uuid.uuid4().hex[:8]}"
+
+    #Scraped fields mix dicts, numbers and empty strings; store them as text like the CSVs
+    df = df.copy()
+    for col in df.columns[df.dtypes == object]:
+        df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+
+    if dataset == "jobs" and "state" not in df.columns:
+        df = add_location_columns(df)
+    elif dataset == "houses":
+        #About a third of the listings only name their district and state in 'Name'
+        df = fill_geo_columns(df)
+    df = df.assign(scrape_date=scrape_date.isoformat())
+
+    paths = []
+    for name, frame in [(dataset, df), (f"{dataset}_agg", snapshot_aggregates(df, dataset))]:
+        partition = _partition_dir(name, scrape_date, root)
+        os.makedirs(partition, exist_ok=True)
+        path = os.path.join(partition, f"{run_id}.parquet")
+        if os.path.exists(path):
+            raise FileExistsError(f"Snapshot '{path}' already exists")
+        frame.to_parquet(path, index=False)
+        paths.append(path)
+
+    return paths
+
+
+def snapshot_aggregates(df, dataset):
+    """
+    Per-district count, sum and KLL sketch (JSON) of every metric of one snapshot.
+
+    Sums give exact means and the sketches merge across snapshots for medians and
+    percentiles, so trend queries never rescan raw history.
+    """
+    config = DATASETS[dataset]
+    state_col, district_col = config["state"], config["district"]
+
+    rows = []
+    for (state, district), group in df.groupby([state_col, district_col]):
+        row = {"state": state, "district": district, "scrape_date": group["scrape_date"].iloc[0]}
+        for metric in config["metrics"]:
+            values = clean_numeric(group[metric]).dropna()
+            sketch = KLLSketch()
+            sketch.update_many(values)
+            row[f"{metric}_count"] = len(values)
+            row[f"{metric}_sum"] = float(values.sum())
+            row[f"{metric}_sketch"] = json.dumps(sketch.to_dict())
+        rows.append(row)
+
+    return pd.DataFrame(rows)
+
+
+def list_partitions(dataset, start=None, end=None, root=SNAPSHOT_ROOT):
+    """Return [(scrape_date, directory)] within [start, end], pruned by directory name only"""
+    base = os.path.join(root, dataset)
+    if not os.path.isdir(base):
+        return []
+
+    partitions = []
+    for name in sorted(os.listdir(base)):
+        match = _PARTITION.match(name)
+        if not match:
+            continue
+        scrape_date = date.fromisoformat(match.group(1))
+        if (start is None or scrape_date >= start) and (end is None or scrape_date <= end):
+            partitions.append((scrape_date, os.path.join(base, name)))
+    return partitions
+
+
+def read_snapshots(dataset, start=None, end=None, columns=None, root=SNAPSHOT_ROOT):
+    """Read the snapshot rows of the partitions in [start, end] only"""
+    frames = [
+        pd.read_parquet(os.path.join(directory, f), columns=columns)
+        for _, directory in list_partitions(dataset, start, end, root)
+        for f in sorted(os.listdir(directory))
+        if f.endswith(".parquet")
+    ]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(frames, ignore_index=True)
+
+
+def trend(dataset, metric, stat="median", state=None, district=None, weeks=8, end=None,
+          freq="W", root=SNAPSHOT_ROOT):
+    """
+    Return a time series of `stat` ("mean", a QUANTILES name or a quantile such as 0.9) of
+    `metric` over the last `weeks` weeks, one row per `freq` period.
+
+    Only the pre-aggregate partitions inside the window are read. Sketches of all
+    matching districts and snapshots in a period are merged, so e.g. the median
+    salary of Johor Bahru over 8 weeks costs O(partitions x k).
+    """
+    end = end or date.today()
+    start = end - timedelta(weeks=weeks)
+    columns = ["state", "district", "scrape_date", f"{metric}_count", f"{metric}_sum", f"{metric}_sketch"]
+    aggregates = read_snapshots(f"{dataset}_agg", start, end, columns=columns, root=root)
+
+    if state is not None:
+        aggregates = aggregates[aggregates["state"] == state]
+    if district is not None:
+        aggregates = aggregates[aggregates["district"] == district]
+    if aggregates.empty:
+        return pd.DataFrame(columns=["period", "value", "count"])
+
+    periods = pd.to_datetime(aggregates["scrape_date"]).dt.to_period(freq).dt.start_time
+    q = QUANTILES.get(stat, stat)
+
+    rows = []
+    for period, group in aggregates.groupby(periods):
+        count = int(group[f"{metric}_count"].sum())
+        if stat == "mean":
+            value = group[f"{metric}_sum"].sum() / count if count else float("nan")
+        else:
+            merged = KLLSketch()
+            for sketch in group[f"{metric}_sketch"]:
+                merged.merge(KLLSketch.from_dict(json.loads(sketch)))
+            value = merged.quantile(q)
+        rows.append((period, value, count))
+
+    return pd.DataFrame(rows, columns=["period", "value", "count"])